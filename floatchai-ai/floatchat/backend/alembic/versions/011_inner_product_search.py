@@ -0,0 +1,72 @@
+"""
+011 - Inner Product Search
+
+Switches dataset and float semantic search from cosine distance to inner
+product. Embeddings are now L2-normalized before they are stored, so the
+inner product ranks candidates exactly like cosine similarity without the
+two norms and the divide per comparison.
+
+Changes:
+    - Normalize existing dataset_embeddings / float_embeddings vectors
+    - Rebuild both HNSW indexes with vector_ip_ops
+
+Inner-product scores are only cosine similarities for unit vectors, so
+every embedding written before embed_texts started normalizing must be
+re-normalized — this migration does that for the two search tables. Run it
+before serving search from the new code, and do not load vectors into these
+tables from anywhere but embed_texts. Query vectors cached in Redis before
+the switch live under the old key prefix and are never read back.
+query_history keeps cosine distance (<=>), which is unaffected by length.
+
+Requires pgvector >= 0.7.0 for l2_normalize().
+
+Revision ID: 011
+Revises: 009
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+
+
+# Revision identifiers
+revision = "011"
+down_revision = "009"
+branch_labels = None
+depends_on = None
+
+
+_EMBEDDING_TABLES = ("dataset_embeddings", "float_embeddings")
+
+
+def _rebuild_index(table: str, opclass: str) -> None:
+    """Recreate the HNSW index on ``table.embedding`` with ``opclass``."""
+    op.execute(f"DROP INDEX IF EXISTS idx_{table}_embedding")
+    op.execute(f"""
+        CREATE INDEX idx_{table}_embedding
+        ON {table}
+        USING hnsw (embedding {opclass})
+        WITH (m = 16, ef_construction = 64)
+    """)
+
+
+def upgrade() -> None:
+    """Normalize stored embeddings and index them for inner product."""
+
+    for table in _EMBEDDING_TABLES:
+        op.execute(f"""
+            UPDATE {table}
+            SET embedding = l2_normalize(embedding)
+            WHERE embedding IS NOT NULL
+        """)
+        _rebuild_index(table, "vector_ip_ops")
+
+
+def downgrade() -> None:
+    """Restore cosine-distance HNSW indexes.
+
+    Normalized vectors are left in place — cosine distance is unaffected
+    by vector length.
+    """
+
+    for table in _EMBEDDING_TABLES:
+        _rebuild_index(table, "vector_cosine_ops")
@@ -30,6 +30,7 @@ import openai
 import structlog
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi import Request
+from redis import Redis
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
@@ -69,6 +70,21 @@ def _get_openai_client() -> openai.OpenAI:
     return openai.OpenAI(api_key=settings.OPENAI_API_KEY)
 
 
+def _get_redis_client() -> Optional[Redis]:
+    """
+    Create a Redis client for the query embedding cache.
+    Vectors are stored as raw bytes, so responses are not decoded.
+    Returns None when Redis is unavailable.
+    """
+    try:
+        client = Redis.from_url(settings.REDIS_URL, decode_responses=False)
+        client.ping()
+        return client
+    except Exception as exc:
+        logger.warning("redis_unavailable_for_search", error=str(exc))
+        return None
+
+
 def _handle_pgvector_error(exc: Exception) -> None:
     """
     Check if an exception is related to pgvector unavailability.
@@ -141,6 +157,7 @@ async def search_datasets_endpoint(
             filters=filters if filters else None,
             limit=limit,
             public_only=bool(getattr(current_user, "api_key_scoped", False)),
+            redis_client=_get_redis_client(),
         )
 
         elapsed = round(time.time() - start_time, 3)
@@ -204,6 +221,7 @@ async def search_floats_endpoint(
             openai_client=client,
             filters=filters if filters else None,
             limit=limit,
+            redis_client=_get_redis_client(),
         )
 
         elapsed = round(time.time() - start_time, 3)
@@ -106,8 +106,9 @@ def _parse_suggestions(content: str) -> list[str]:
     content = content.strip()
 
     # Try to extract JSON array from the response
-    # The LLM may wrap it in markdown code blocks
-    if "```" in content:
+    # The LLM may wrap it in markdown code blocks; a bare array (the
+    # common case) goes straight to json.loads
+    if not content.startswith("[") and "```" in content:
         # Extract content between code block markers
         parts = content.split("```")
         for part in parts:
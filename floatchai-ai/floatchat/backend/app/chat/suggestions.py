@@ -13,7 +13,8 @@ Never raises — all exceptions are caught, logged, and fallbacks returned.
 """
 
 import json
-from typing import Any, Optional
+from itertools import islice
+from typing import Any, Iterator, Optional
 
 import structlog
 from redis import Redis
@@ -132,8 +133,25 @@ def _build_suggestions_from_datasets(
     suggestion. Returns 4–6 suggestions.
     """
     target_count = getattr(settings, "CHAT_SUGGESTIONS_COUNT", 6)
-    suggestions: list[dict[str, str]] = []
+    suggestions = list(islice(_suggestion_candidates(summaries), target_count))
 
+    log.info(
+        "suggestions_built_from_datasets",
+        dataset_count=len(summaries),
+        suggestion_count=len(suggestions),
+    )
+
+    return suggestions
+
+
+def _suggestion_candidates(
+    summaries: list[dict[str, Any]],
+) -> Iterator[dict[str, str]]:
+    """
+    Yield suggestions in priority order.
+
+    Lazy so that only the first CHAT_SUGGESTIONS_COUNT entries are built.
+    """
     # Use the first dataset for primary suggestions
     primary = summaries[0]
     ds_name = primary.get("name", "the dataset")
@@ -147,65 +165,54 @@ def _build_suggestions_from_datasets(
     end_year = date_end[:4] if date_end and len(date_end) >= 4 else "2025"
 
     # Suggestion 1: Spatial query
-    suggestions.append({
+    yield {
         "query": f"Show me all float profiles in the North Atlantic from {ds_name}",
         "description": f"Browse profiles from {ds_name} in a well-sampled region",
-    })
+    }
 
     # Suggestion 2: Temporal query
-    suggestions.append({
+    yield {
         "query": f"How many profiles were collected between {start_year} and {end_year}?",
         "description": f"Explore the temporal coverage of available data ({start_year}–{end_year})",
-    })
+    }
 
     # Suggestion 3: Variable-specific query
     if variables and len(variables) > 0:
         var = variables[0] if isinstance(variables[0], str) else str(variables[0])
-        suggestions.append({
+        yield {
             "query": f"What is the average {var} at 500m depth in the Southern Ocean?",
             "description": f"Analyze deep-water {var} patterns across the Southern Ocean",
-        })
+        }
     else:
-        suggestions.append({
+        yield {
             "query": "What is the average temperature at 500m depth in the Southern Ocean?",
             "description": "Analyze deep-water temperature patterns across the Southern Ocean",
-        })
+        }
 
     # Suggestion 4: Count/overview query
-    suggestions.append({
+    yield {
         "query": f"How many active floats are in {ds_name}?",
         "description": f"Get an overview of the {float_count} floats in this dataset",
-    })
+    }
 
     # Suggestion 5: Second variable or depth query
     if variables and len(variables) > 1:
         var2 = variables[1] if isinstance(variables[1], str) else str(variables[1])
-        suggestions.append({
+        yield {
             "query": f"Show me {var2} profiles from the Pacific Ocean in {end_year}",
             "description": f"Explore {var2} data in the Pacific for the most recent period",
-        })
+        }
     else:
-        suggestions.append({
+        yield {
             "query": f"Show me depth profiles near the Gulf Stream from {end_year}",
             "description": "Examine profile structure in a major boundary current",
-        })
+        }
 
     # Suggestion 6: Use a second dataset if available
     if len(summaries) > 1:
         secondary = summaries[1]
         sec_name = secondary.get("name", "another dataset")
-        suggestions.append({
+        yield {
             "query": f"Compare float counts between {ds_name} and {sec_name}",
             "description": "Compare coverage across different datasets",
-        })
-
-    # Trim to target count
-    suggestions = suggestions[:target_count]
-
-    log.info(
-        "suggestions_built_from_datasets",
-        dataset_count=len(summaries),
-        suggestion_count=len(suggestions),
-    )
-
-    return suggestions
+        }
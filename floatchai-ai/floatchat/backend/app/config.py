@@ -84,6 +84,9 @@ class Settings(BaseSettings):
     # =========================================================================
     MAX_UPLOAD_SIZE_BYTES: int = 2_147_483_648  # 2GB
     DB_INSERT_BATCH_SIZE: int = 1000
+    DB_COPY_MIN_ROWS: int = 1  # Profiles with at least this many measurements are written via COPY (when supported)
+    PARSE_PARALLEL_MIN_PROFILES: int = 32  # Parse multi-profile files in a process pool at/above this count
+    PARSE_MAX_WORKERS: int = 0  # Process-pool size for multi-profile files; below 2 = parse serially
     
     # =========================================================================
     # Authentication (JWT)
@@ -123,6 +126,7 @@ class Settings(BaseSettings):
     RECENCY_BOOST_VALUE: float = 0.05
     REGION_MATCH_BOOST_VALUE: float = 0.10
     FUZZY_MATCH_THRESHOLD: float = 0.4
+    QUERY_EMBEDDING_CACHE_TTL_SECONDS: int = 86400  # Cached search query vectors
     
     # =========================================================================
     # Natural Language Query Engine (Feature 4)
@@ -8,15 +8,18 @@ Exports:
     FloatInfo: Float metadata dataclass
     ProfileInfo: Profile metadata dataclass
     MeasurementRecord: Single measurement dataclass
+    MeasurementArray: Column-wise measurements of one profile
     clean_measurements: Clean and flag outliers in measurements
     clean_parse_result: Clean measurements from ParseResult
     CleanedMeasurement: Measurement with outlier flags
+    CleanedMeasurementArray: Column-wise cleaned measurements of one profile
     CleaningResult: Result of cleaning process
     CleaningStats: Statistics from cleaning
 """
 
 from app.ingestion.cleaner import (
     CleanedMeasurement,
+    CleanedMeasurementArray,
     CleaningResult,
     CleaningStats,
     clean_measurements,
@@ -24,6 +27,7 @@ from app.ingestion.cleaner import (
 )
 from app.ingestion.parser import (
     FloatInfo,
+    MeasurementArray,
     MeasurementRecord,
     ParseResult,
     ProfileInfo,
@@ -39,10 +43,12 @@ __all__ = [
     "FloatInfo",
     "ProfileInfo",
     "MeasurementRecord",
+    "MeasurementArray",
     # Cleaner exports
     "clean_measurements",
     "clean_parse_result",
     "CleanedMeasurement",
+    "CleanedMeasurementArray",
     "CleaningResult",
     "CleaningStats",
 ]
@@ -18,9 +18,15 @@ Outlier Bounds (from oceanographic literature):
 from dataclasses import dataclass, field
 from typing import Optional
 
+import numpy as np
 import structlog
 
-from app.ingestion.parser import MeasurementRecord, ParseResult
+from app.ingestion.parser import (
+    MEASUREMENT_FIELDS,
+    MeasurementArray,
+    MeasurementRecord,
+    ParseResult,
+)
 
 logger = structlog.get_logger(__name__)
 
@@ -91,13 +97,110 @@ class CleanedMeasurement:
         ])
 
 
+@dataclass(slots=True, eq=False)
+class CleanedMeasurementArray:
+    """
+    Cleaned measurements of one profile, stored column-wise.
+    
+    ``values`` are the parser's float64 columns (NaN for missing values)
+    and ``flags`` holds one boolean outlier mask per OUTLIER_BOUNDS
+    variable; a variable with no mask is treated as never flagged.
+    Iterating or indexing yields CleanedMeasurement rows, so
+    record-oriented callers still work.
+    """
+    values: MeasurementArray = field(default_factory=MeasurementArray)
+    flags: dict[str, np.ndarray] = field(default_factory=dict)
+    
+    def __post_init__(self) -> None:
+        count = len(self.values)
+        flags = {
+            variable: np.asarray(self.flags.get(variable, np.zeros(count, dtype=bool)), dtype=bool)
+            for variable in OUTLIER_BOUNDS
+        }
+        for variable, mask in flags.items():
+            if mask.shape != (count,):
+                raise ValueError(
+                    f"{variable} flag mask has shape {mask.shape}, expected ({count},)"
+                )
+        self.flags = flags
+    
+    @classmethod
+    def from_records(cls, records: list[CleanedMeasurement]) -> "CleanedMeasurementArray":
+        """Build the columns and flag masks from CleanedMeasurements."""
+        count = len(records)
+        return cls(
+            values=MeasurementArray.from_records(records),
+            flags={
+                variable: np.fromiter(
+                    (getattr(record, f"{variable}_flag") for record in records),
+                    dtype=bool,
+                    count=count,
+                )
+                for variable in OUTLIER_BOUNDS
+            },
+        )
+    
+    @property
+    def is_outlier(self) -> np.ndarray:
+        """Per-level mask of CleanedMeasurement.has_outlier."""
+        return np.logical_or.reduce(list(self.flags.values()))
+    
+    def column(self, name: str) -> list[Optional[float]]:
+        """Return one variable as native floats, with missing values as None."""
+        return self.values.column(name)
+    
+    def records(self) -> list[CleanedMeasurement]:
+        """Materialize every level as a CleanedMeasurement."""
+        if not len(self):
+            return []
+        flag_columns = [
+            self.flags[variable].tolist() for variable in OUTLIER_BOUNDS
+        ]
+        flag_names = [f"{variable}_flag" for variable in OUTLIER_BOUNDS]
+        return [
+            CleanedMeasurement(
+                *row[:len(MEASUREMENT_FIELDS)],
+                **dict(zip(flag_names, row[len(MEASUREMENT_FIELDS):])),
+            )
+            for row in zip(
+                *(self.values.column(name) for name in MEASUREMENT_FIELDS),
+                *flag_columns,
+            )
+        ]
+    
+    def __len__(self) -> int:
+        return len(self.values)
+    
+    def __iter__(self):
+        return iter(self.records())
+    
+    def __getitem__(self, index: int) -> CleanedMeasurement:
+        record = self.values[index]
+        flags = {
+            f"{variable}_flag": bool(mask[index])
+            for variable, mask in self.flags.items()
+        }
+        return CleanedMeasurement(
+            *(getattr(record, name) for name in MEASUREMENT_FIELDS), **flags
+        )
+
+
 @dataclass
 class CleaningResult:
-    """Result of the cleaning process."""
+    """
+    Result of the cleaning process.
+    
+    measurements may be given as a list of CleanedMeasurements; it is
+    converted to a CleanedMeasurementArray on construction.
+    """
     success: bool
-    measurements: list[CleanedMeasurement] = field(default_factory=list)
+    measurements: CleanedMeasurementArray = field(default_factory=CleanedMeasurementArray)
     stats: CleaningStats = field(default_factory=CleaningStats)
     error_message: Optional[str] = None
+    
+    def __post_init__(self) -> None:
+        if not isinstance(self.measurements, CleanedMeasurementArray):
+            self.measurements = CleanedMeasurementArray.from_records(self.measurements)
 
 
 def _is_outlier(value: Optional[float], variable: str) -> bool:
@@ -153,15 +256,36 @@ def clean_measurement(record: MeasurementRecord) -> CleanedMeasurement:
     return cleaned
 
 
+def _outlier_masks(measurements: MeasurementArray) -> dict[str, np.ndarray]:
+    """
+    Compute a boolean outlier mask per variable over all measurements.
+    
+    Missing values are NaN, which compares False against both bounds,
+    so they are never flagged (same as _is_outlier).
+    
+    Args:
+        measurements: Column-wise measurements
+    
+    Returns:
+        Dictionary mapping variable names to boolean arrays
+    """
+    masks = {}
+    for variable, (min_val, max_val) in OUTLIER_BOUNDS.items():
+        values = getattr(measurements, variable)
+        masks[variable] = (values < min_val) | (values > max_val)
+    return masks
+
+
 def clean_measurements(
-    measurements: list[MeasurementRecord],
+    measurements: MeasurementArray | list[MeasurementRecord],
     job_id: Optional[str] = None,
 ) -> CleaningResult:
     """
-    Clean a list of measurement records.
+    Clean a profile's measurements.
     
     Args:
-        measurements: List of raw measurements from the parser
+        measurements: Column-wise measurements from the parser, or a list
+            of raw measurement records
         job_id: Optional job ID for logging context
     
     Returns:
@@ -171,40 +295,28 @@ def clean_measurements(
     
     log.info("cleaning_started", record_count=len(measurements))
     
-    if not measurements:
+    if not len(measurements):
         return CleaningResult(
             success=True,
-            measurements=[],
+            measurements=CleanedMeasurementArray(),
             stats=CleaningStats(),
         )
     
-    cleaned_measurements = []
+    if not isinstance(measurements, MeasurementArray):
+        measurements = MeasurementArray.from_records(measurements)
+    
     stats = CleaningStats(total_records=len(measurements))
-    stats.flags_by_variable = {var: 0 for var in OUTLIER_BOUNDS.keys()}
-    
-    for record in measurements:
-        cleaned = clean_measurement(record)
-        cleaned_measurements.append(cleaned)
-        
-        # Update statistics
-        if cleaned.has_outlier:
-            stats.flagged_records += 1
-        
-        # Count flags by variable
-        if cleaned.temperature_flag:
-            stats.flags_by_variable["temperature"] += 1
-        if cleaned.salinity_flag:
-            stats.flags_by_variable["salinity"] += 1
-        if cleaned.pressure_flag:
-            stats.flags_by_variable["pressure"] += 1
-        if cleaned.oxygen_flag:
-            stats.flags_by_variable["oxygen"] += 1
-        if cleaned.chlorophyll_a_flag:
-            stats.flags_by_variable["chlorophyll_a"] += 1
-        if cleaned.nitrate_flag:
-            stats.flags_by_variable["nitrate"] += 1
-        if cleaned.ph_flag:
-            stats.flags_by_variable["ph"] += 1
+    
+    # Vectorized outlier detection: one boolean mask per variable
+    flag_masks = _outlier_masks(measurements)
+    any_flag = np.logical_or.reduce(list(flag_masks.values()))
+    stats.flagged_records = int(any_flag.sum())
+    stats.flags_by_variable = {
+        var: int(mask.sum()) for var, mask in flag_masks.items()
+    }
+    
+    # Keep the columns as arrays; rows are only materialized on iteration
+    cleaned_measurements = CleanedMeasurementArray(values=measurements, flags=flag_masks)
     
     log.info(
         "cleaning_complete",
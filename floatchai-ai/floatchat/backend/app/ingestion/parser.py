@@ -10,16 +10,24 @@ Extracted Data:
 - Measurements: temperature, salinity, and BGC parameters (if present)
 """
 
+import copy
 import hashlib
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Optional
 
+import netCDF4
 import numpy as np
 import structlog
 import xarray as xr
 
+from app.config import settings
+
 logger = structlog.get_logger(__name__)
 
 # BGC parameters to extract (in addition to core T/S)
@@ -29,6 +37,7 @@ BGC_VARIABLES = {
     "NITRATE": "nitrate",
     "PH_IN_SITU_TOTAL": "ph",
 }
+_BGC_VARIABLE_NAMES = frozenset(BGC_VARIABLES)
 
 # Core Argo variables
 CORE_VARIABLES = {
@@ -39,15 +48,31 @@ CORE_VARIABLES = {
 # All measurement variables
 ALL_VARIABLES = {**CORE_VARIABLES, **BGC_VARIABLES}
 
+# ARGO _FillValue for missing measurements and JULD
+FILL_VALUE = 99999.0
+
+# Successful parse results keyed by (path, inode, mtime_ns, size) so that
+# re-parsing an unchanged file (retries, re-uploads) skips the NetCDF read.
+_PARSE_CACHE: "OrderedDict[tuple[str, int, int, int], ParseResult]" = OrderedDict()
+_PARSE_CACHE_MAX = 64
+
+# Files up to this size are read into memory once, hashed, and decoded from
+# the same buffer; larger files fall back to hashing and opening by path.
+_IN_MEMORY_MAX_BYTES = 256 * 1024 * 1024
+
 
-@dataclass
+# Parser dataclasses are slotted: record views of a BGC file number in the
+# thousands, and slots drop the per-instance __dict__.
+
+
+@dataclass(slots=True)
 class FloatInfo:
     """Extracted float metadata."""
     wmo_id: str
     float_type: str  # 'core' or 'bgc'
 
 
-@dataclass
+@dataclass(slots=True)
 class ProfileInfo:
     """Extracted profile metadata."""
     cycle_number: int
@@ -58,7 +83,7 @@ class ProfileInfo:
     n_levels: int
 
 
-@dataclass
+@dataclass(slots=True)
 class MeasurementRecord:
     """Single measurement at a depth level."""
     pressure: float
@@ -70,15 +95,104 @@ class MeasurementRecord:
     ph: Optional[float] = None
 
 
-@dataclass
+# MeasurementRecord fields, in constructor order
+MEASUREMENT_FIELDS = (
+    "pressure",
+    "temperature",
+    "salinity",
+    "oxygen",
+    "chlorophyll_a",
+    "nitrate",
+    "ph",
+)
+
+
+def _empty_column() -> np.ndarray:
+    return np.empty(0)
+
+
+@dataclass(slots=True, eq=False)
+class MeasurementArray:
+    """
+    All measurements of one profile, stored column-wise.
+    
+    Each field is a float64 array with one entry per depth level and NaN
+    for missing values. Iterating or indexing yields MeasurementRecord
+    rows (missing values as None), so record-oriented callers still work.
+    """
+    pressure: np.ndarray = field(default_factory=_empty_column)
+    temperature: np.ndarray = field(default_factory=_empty_column)
+    salinity: np.ndarray = field(default_factory=_empty_column)
+    oxygen: np.ndarray = field(default_factory=_empty_column)
+    chlorophyll_a: np.ndarray = field(default_factory=_empty_column)
+    nitrate: np.ndarray = field(default_factory=_empty_column)
+    ph: np.ndarray = field(default_factory=_empty_column)
+    
+    @classmethod
+    def from_records(cls, records: list[MeasurementRecord]) -> "MeasurementArray":
+        """Build the column arrays from MeasurementRecords (None becomes NaN)."""
+        count = len(records)
+        return cls(**{
+            name: np.fromiter(
+                (
+                    np.nan if (value := getattr(record, name)) is None else value
+                    for record in records
+                ),
+                dtype=np.float64,
+                count=count,
+            )
+            for name in MEASUREMENT_FIELDS
+        })
+    
+    def column(self, name: str) -> list[Optional[float]]:
+        """Return one variable as native floats, with missing values as None."""
+        values = getattr(self, name)
+        return _optional_floats(values, np.isnan(values))
+    
+    def records(self) -> list[MeasurementRecord]:
+        """Materialize every level as a MeasurementRecord."""
+        return [
+            MeasurementRecord(*row)
+            for row in zip(*(self.column(name) for name in MEASUREMENT_FIELDS))
+        ]
+    
+    def __len__(self) -> int:
+        return len(self.pressure)
+    
+    def __iter__(self):
+        return iter(self.records())
+    
+    def __getitem__(self, index: int) -> MeasurementRecord:
+        values = (float(getattr(self, name)[index]) for name in MEASUREMENT_FIELDS)
+        return MeasurementRecord(*(None if np.isnan(v) else v for v in values))
+    
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, MeasurementArray):
+            return NotImplemented
+        return all(
+            np.array_equal(getattr(self, name), getattr(other, name), equal_nan=True)
+            for name in MEASUREMENT_FIELDS
+        )
+
+
+@dataclass(slots=True)
 class ParseResult:
-    """Complete result from parsing a NetCDF file."""
+    """
+    Complete result from parsing a NetCDF file.
+    
+    measurements may be given as a list of MeasurementRecords; it is
+    converted to a MeasurementArray on construction.
+    """
     success: bool
     error_message: Optional[str] = None
     file_hash: Optional[str] = None
     float_info: Optional[FloatInfo] = None
     profile_info: Optional[ProfileInfo] = None
-    measurements: list[MeasurementRecord] = field(default_factory=list)
+    measurements: MeasurementArray = field(default_factory=MeasurementArray)
+    
+    def __post_init__(self) -> None:
+        if not isinstance(self.measurements, MeasurementArray):
+            self.measurements = MeasurementArray.from_records(self.measurements)
     
     @property
     def extracted_rows_count(self) -> int:
@@ -129,12 +243,38 @@ def validate_file(file_path: str) -> tuple[bool, Optional[str]]:
 
 
 def compute_file_hash(file_path: str) -> str:
-    """Compute SHA-256 hash of a file."""
-    sha256 = hashlib.sha256()
+    """
+    Compute SHA-256 hash of a file.
+    
+    hashlib.file_digest (Python 3.11+) reads the file in C with the GIL
+    released, avoiding a Python-level loop over 8 KiB chunks.
+    """
+    with open(file_path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _open_dataset_with_hash(file_path: str) -> tuple[xr.Dataset, str]:
+    """
+    Open a NetCDF file and compute its SHA-256 hash in a single read.
+
+    The file bytes are hashed and handed to netCDF4 as an in-memory
+    dataset, so the file is only read from disk once. Files larger than
+    _IN_MEMORY_MAX_BYTES are hashed and opened from the path instead.
+
+    Args:
+        file_path: Path to the NetCDF file
+
+    Returns:
+        Tuple of (dataset, hex digest)
+    """
+    if os.path.getsize(file_path) > _IN_MEMORY_MAX_BYTES:
+        return xr.open_dataset(file_path), compute_file_hash(file_path)
+
     with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            sha256.update(chunk)
-    return sha256.hexdigest()
+        buf = f.read()
+    file_hash = hashlib.sha256(buf).hexdigest()
+    nc = netCDF4.Dataset(file_path, mode="r", memory=buf)
+    return xr.open_dataset(xr.backends.NetCDF4DataStore(nc)), file_hash
 
 
 def _safe_scalar(value: Any) -> Any:
@@ -187,10 +327,8 @@ def _determine_float_type(ds: xr.Dataset) -> str:
     
     G-14 resolution: float_type inferred from BGC variable presence.
     """
-    for bgc_var in BGC_VARIABLES.keys():
-        if bgc_var in ds.data_vars:
-            return "bgc"
-    return "core"
+    # Once per file: a single set check against the dataset's variables
+    return "core" if _BGC_VARIABLE_NAMES.isdisjoint(ds.data_vars) else "bgc"
 
 
 def _extract_float_info(ds: xr.Dataset) -> FloatInfo:
@@ -236,7 +374,7 @@ def _extract_datetime(ds: xr.Dataset, index: int = 0) -> Optional[datetime]:
     except (TypeError, ValueError):
         return None
     
-    if np.isnan(fval) or fval == 99999.0:
+    if np.isnan(fval) or fval == FILL_VALUE:
         return None
     
     # ARGO uses days since 1950-01-01
@@ -306,56 +444,110 @@ def _extract_profile_info(ds: xr.Dataset, profile_idx: int = 0) -> ProfileInfo:
     )
 
 
-def _extract_measurements(
-    ds: xr.Dataset,
-    profile_idx: int = 0,
-) -> list[MeasurementRecord]:
-    """Extract all measurements for a profile."""
-    measurements = []
+@dataclass(slots=True)
+class _VariableMatrices:
+    """
+    Every measurement variable of a file as (N_PROF, N_LEVELS) float64 arrays.
     
-    # Get pressure array
+    Fill values are NaN and missing-value masks are precomputed, so each
+    profile is a row slice rather than a fresh read of the dataset. Arrays
+    with a single row (1-D variables, absent variables) apply to every
+    profile.
+    """
+    pressures: np.ndarray
+    columns: dict[str, np.ndarray]
+    missing: dict[str, np.ndarray]
+
+
+def _variable_matrix(data: np.ndarray, n_levels: int) -> np.ndarray:
+    """
+    Convert a variable to a float64 (rows, n_levels) array.
+    
+    Fill values (99999.0) become NaN; levels beyond the variable's length
+    are padded with NaN.
+    """
+    data = np.atleast_2d(data)
+    values = np.full((data.shape[0], n_levels), np.nan)
+    count = min(data.shape[1], n_levels)
+    values[:, :count] = data[:, :count]
+    # Vectorized fill-value compare over the whole variable, no per-level branch
+    values[np.isclose(values, FILL_VALUE, rtol=0.0, atol=1e-6)] = np.nan
+    return values
+
+
+def _read_measurement_arrays(ds: xr.Dataset) -> Optional[_VariableMatrices]:
+    """Read PRES and every measurement variable once for all profiles."""
     if "PRES" not in ds:
         logger.warning("no_pressure_variable")
-        return measurements
+        return None
     
     pres_var = ds["PRES"].values
+    n_levels = pres_var.shape[-1] if pres_var.ndim else 0
     
-    # Handle 2D array (N_PROF x N_LEVELS)
-    if pres_var.ndim == 2:
-        pressures = pres_var[profile_idx]
-    else:
-        pressures = pres_var
-    
-    # Build a dict of available variable data
-    var_data: dict[str, np.ndarray] = {}
+    # Absent variables are a single all-NaN row shared by every profile
+    columns: dict[str, np.ndarray] = {}
     for nc_name, our_name in ALL_VARIABLES.items():
         if nc_name in ds:
-            data = ds[nc_name].values
-            if data.ndim == 2:
-                var_data[our_name] = data[profile_idx]
-            else:
-                var_data[our_name] = data
-    
-    # Extract measurements at each pressure level
-    for i, pres in enumerate(pressures):
-        if np.isnan(pres) or pres == 99999.0:
-            continue
-        
-        record = MeasurementRecord(pressure=float(_safe_scalar(pres)))
-        
-        for our_name in ALL_VARIABLES.values():
-            if our_name in var_data:
-                data = var_data[our_name]
-                if i < len(data):
-                    val = data[i]
-                    if not (np.isnan(val) or val == 99999.0):
-                        setattr(record, our_name, float(_safe_scalar(val)))
-        
-        # Only include records with at least temperature or salinity
-        if record.temperature is not None or record.salinity is not None:
-            measurements.append(record)
+            columns[our_name] = _variable_matrix(ds[nc_name].values, n_levels)
+        else:
+            columns[our_name] = np.full((1, n_levels), np.nan)
+    
+    return _VariableMatrices(
+        pressures=_variable_matrix(pres_var, n_levels),
+        columns=columns,
+        missing={name: np.isnan(values) for name, values in columns.items()},
+    )
+
+
+def _row(values: np.ndarray, profile_idx: int) -> np.ndarray:
+    """Select one profile's row, broadcasting single-row arrays."""
+    return values[profile_idx] if values.shape[0] > 1 else values[0]
+
+
+def _optional_floats(values: np.ndarray, missing: np.ndarray) -> list[Optional[float]]:
+    """Convert a float array to native floats with missing entries as None, in C."""
+    boxed = values.astype(object)
+    boxed[missing] = None
+    return boxed.tolist()
+
+
+def _profile_measurements(
+    arrays: _VariableMatrices,
+    profile_idx: int,
+) -> MeasurementArray:
+    """Slice one profile's kept levels out of the pre-read arrays."""
+    pressures = _row(arrays.pressures, profile_idx)
+    
+    # Keep levels with a valid pressure and at least temperature or salinity
+    keep = ~np.isnan(pressures) & ~(
+        _row(arrays.missing["temperature"], profile_idx)
+        & _row(arrays.missing["salinity"], profile_idx)
+    )
+    
+    # Boolean indexing copies, so each profile owns its columns
+    return MeasurementArray(
+        pressure=pressures[keep],
+        **{
+            name: _row(values, profile_idx)[keep]
+            for name, values in arrays.columns.items()
+        },
+    )
+
+
+def _extract_measurements(
+    ds: xr.Dataset,
+    profile_idx: int = 0,
+) -> MeasurementArray:
+    """
+    Extract all measurements for a profile.
     
-    return measurements
+    Multi-profile callers should read the arrays once with
+    _read_measurement_arrays and call _profile_measurements per profile.
+    """
+    arrays = _read_measurement_arrays(ds)
+    if arrays is None:
+        return MeasurementArray()
+    return _profile_measurements(arrays, profile_idx)
 
 
 def parse_netcdf_file(
@@ -365,6 +557,10 @@ def parse_netcdf_file(
     """
     Parse an ARGO NetCDF profile file.
     
+    Successful results are cached per file (path, inode, mtime, size), so
+    re-parsing an unchanged file returns a copy without reading it again.
+    Call parse_netcdf_file.cache_clear() to force a reload.
+    
     Args:
         file_path: Path to the NetCDF file
         job_id: Optional job ID for logging context
@@ -373,14 +569,43 @@ def parse_netcdf_file(
         ParseResult with extracted data or error information
     """
     log = logger.bind(job_id=job_id, file_path=file_path)
+    
+    cache_key = _parse_cache_key(file_path)
+    if cache_key is not None and cache_key in _PARSE_CACHE:
+        _PARSE_CACHE.move_to_end(cache_key)
+        log.info("parse_cache_hit")
+        # Deep copy so callers cannot mutate the cached result
+        return copy.deepcopy(_PARSE_CACHE[cache_key])
+    
+    result = _parse_netcdf_file_uncached(file_path, log)
+    
+    if cache_key is not None and result.success:
+        _PARSE_CACHE[cache_key] = copy.deepcopy(result)
+        if len(_PARSE_CACHE) > _PARSE_CACHE_MAX:
+            _PARSE_CACHE.popitem(last=False)
+    
+    return result
+
+
+parse_netcdf_file.cache_clear = _PARSE_CACHE.clear
+
+
+def _parse_cache_key(file_path: str) -> Optional[tuple[str, int, int, int]]:
+    """Build the parse cache key from file stat, or None if unavailable."""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (os.path.realpath(file_path), st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _parse_netcdf_file_uncached(file_path: str, log: Any) -> ParseResult:
+    """Parse a NetCDF profile file without consulting the parse cache."""
     log.info("parse_started")
     
     try:
-        # Compute file hash for deduplication
-        file_hash = compute_file_hash(file_path)
-        
-        # Open the NetCDF file
-        ds = xr.open_dataset(file_path)
+        # Read the file once: hash for deduplication, then decode in memory
+        ds, file_hash = _open_dataset_with_hash(file_path)
         
         try:
             # Reject trajectory files (Q1 resolution)
@@ -449,6 +674,8 @@ def parse_netcdf_all_profiles(
     
     Some ARGO files contain multiple profiles (e.g., merged files).
     This function extracts each profile as a separate ParseResult.
+    When PARSE_MAX_WORKERS is set, files with at least
+    PARSE_PARALLEL_MIN_PROFILES profiles are decoded across a process pool.
     
     Args:
         file_path: Path to the NetCDF file
@@ -461,8 +688,7 @@ def parse_netcdf_all_profiles(
     results = []
     
     try:
-        file_hash = compute_file_hash(file_path)
-        ds = xr.open_dataset(file_path)
+        ds, file_hash = _open_dataset_with_hash(file_path)
         
         try:
             if _is_trajectory_file(ds, file_path):
@@ -485,10 +711,13 @@ def parse_netcdf_all_profiles(
             
             float_info = _extract_float_info(ds)
             
-            for idx in range(n_prof):
-                profile_info = _extract_profile_info(ds, profile_idx=idx)
-                measurements = _extract_measurements(ds, profile_idx=idx)
-                
+            profiles = None
+            if _should_parse_in_parallel(n_prof):
+                profiles = _parse_profiles_parallel(file_path, n_prof, log)
+            if profiles is None:
+                profiles = _parse_profile_range(ds, range(n_prof))
+            
+            for profile_info, measurements in profiles:
                 results.append(ParseResult(
                     success=True,
                     file_hash=file_hash,
@@ -508,3 +737,102 @@ def parse_netcdf_all_profiles(
             success=False,
             error_message=f"Failed to parse NetCDF file: {str(e)}",
         )]
+
+
+def _parse_profile_range(
+    ds: xr.Dataset,
+    profile_indices: range,
+) -> list[tuple[ProfileInfo, MeasurementArray]]:
+    """
+    Extract (profile_info, measurements) for a range of profile indices.
+    
+    Measurement variables are read and masked once for the whole file,
+    then sliced per profile.
+    """
+    arrays = _read_measurement_arrays(ds)
+    return [
+        (
+            _extract_profile_info(ds, profile_idx=idx),
+            _profile_measurements(arrays, idx) if arrays is not None else MeasurementArray(),
+        )
+        for idx in profile_indices
+    ]
+
+
+def _parse_profile_range_worker(
+    file_path: str,
+    profile_indices: range,
+) -> list[tuple[ProfileInfo, MeasurementArray]]:
+    """Process-pool entry point: open the file once and parse a block of profiles."""
+    with xr.open_dataset(file_path) as ds:
+        return _parse_profile_range(ds, profile_indices)
+
+
+def _in_daemon_process() -> bool:
+    """
+    True inside a multiprocessing or Celery (billiard) pool child.
+    
+    Celery prefork children are billiard processes, which the stdlib's
+    ``current_process()`` does not see, so both are checked.
+    """
+    if multiprocessing.current_process().daemon:
+        return True
+    try:
+        from billiard.process import current_process as billiard_current_process
+    except ImportError:
+        return False
+    return bool(billiard_current_process().daemon)
+
+
+def _should_parse_in_parallel(n_prof: int) -> bool:
+    """
+    Decide whether a multi-profile file should be parsed in a process pool.
+    
+    The pool is opt-in (PARSE_MAX_WORKERS >= 2). Daemonic pool children,
+    including Celery prefork workers, always parse serially: the worker
+    pool already spreads files across processes, and a pool per task would
+    multiply concurrency by the worker count.
+    """
+    if settings.PARSE_MAX_WORKERS < 2:
+        return False
+    if n_prof < max(settings.PARSE_PARALLEL_MIN_PROFILES, 2):
+        return False
+    return not _in_daemon_process()
+
+
+def _parse_profiles_parallel(
+    file_path: str,
+    n_prof: int,
+    log: Any,
+) -> Optional[list[tuple[ProfileInfo, MeasurementArray]]]:
+    """
+    Parse profiles across a process pool, one contiguous block per worker.
+    
+    Each worker opens its own dataset handle, so decoding is not serialized
+    by the GIL or the HDF5 library lock.
+    
+    Returns:
+        Profiles in file order, or None if the pool could not be used
+        (the caller then falls back to the serial path)
+    """
+    workers = min(settings.PARSE_MAX_WORKERS, n_prof)
+    if workers < 2:
+        return None
+    
+    block = -(-n_prof // workers)  # ceiling division
+    blocks = [range(start, min(start + block, n_prof)) for start in range(0, n_prof, block)]
+    
+    try:
+        with ProcessPoolExecutor(max_workers=len(blocks)) as pool:
+            chunks = pool.map(
+                _parse_profile_range_worker,
+                [file_path] * len(blocks),
+                blocks,
+            )
+            profiles = [profile for chunk in chunks for profile in chunk]
+    except Exception as e:
+        log.warning("parallel_parse_failed_falling_back", error=str(e))
+        return None
+    
+    log.info("parsed_profiles_in_parallel", n_profiles=n_prof, workers=len(blocks))
+    return profiles
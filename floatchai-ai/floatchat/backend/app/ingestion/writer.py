@@ -5,19 +5,20 @@ Handles all database write operations for the ingestion pipeline.
 All operations are idempotent using upsert logic.
 
 Key Design Decisions:
-- Never calls db.commit() - only db.flush() to get generated IDs
+- Never calls db.commit(); upserts return generated IDs via RETURNING,
+  ORM adds use db.flush()
 - Caller (tasks.py) is responsible for transaction management
-- Uses bulk_insert_mappings for measurements in batches
-- PostGIS geometry created via shapely + geoalchemy2
+- Uses COPY FROM STDIN for measurements, bulk_insert_mappings in batches when COPY is unavailable
+- PostGIS points passed as EWKT strings to ST_GeogFromText
 """
 
+import io
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Optional
 
 import structlog
-from geoalchemy2 import WKTElement
-from shapely.geometry import Point
-from sqlalchemy import delete, select, text
+from sqlalchemy import delete, func, select
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
@@ -30,36 +31,47 @@ from app.db.models import (
     Measurement,
     Profile,
 )
-from app.ingestion.cleaner import CleanedMeasurement, CleaningResult
-from app.ingestion.parser import FloatInfo, ParseResult, ProfileInfo
+from app.ingestion.cleaner import CleanedMeasurement, CleanedMeasurementArray, CleaningResult
+from app.ingestion.parser import MEASUREMENT_FIELDS, FloatInfo, ParseResult, ProfileInfo
 
 logger = structlog.get_logger(__name__)
 
+# Columns streamed by COPY; QC flags and BGC extras default to NULL
+_MEASUREMENT_COPY_SQL = (
+    "COPY measurements (profile_id, pressure, temperature, salinity, "
+    "dissolved_oxygen, chlorophyll, nitrate, ph, is_outlier) "
+    "FROM STDIN WITH (FORMAT csv)"
+)
+
 
-def _create_point_geometry(latitude: float, longitude: float) -> WKTElement:
+@lru_cache(maxsize=1024)
+def _create_point_geometry(latitude: float, longitude: float) -> str:
     """
     Create a PostGIS GEOGRAPHY point from lat/lon.
     
+    Cached because each profile's point is built twice (profile and
+    float position) and stationary floats repeat coordinates.
+    
     Args:
         latitude: Latitude in degrees (-90 to 90)
         longitude: Longitude in degrees (-180 to 180)
     
     Returns:
-        WKTElement for PostGIS GEOGRAPHY(POINT, 4326)
+        EWKT string for GEOGRAPHY(POINT, 4326), fixed to 6 decimal places
+        (~0.1 m, well inside Argo position accuracy)
     """
-    point = Point(longitude, latitude)  # Note: PostGIS uses (lon, lat) order
-    return WKTElement(point.wkt, srid=4326)
+    # Note: PostGIS uses (lon, lat) order
+    return f"SRID=4326;POINT({longitude:.6f} {latitude:.6f})"
 
 
 def _is_valid_position(latitude: Optional[float], longitude: Optional[float]) -> bool:
-    """Check if lat/lon are valid for PostGIS geometry."""
-    if latitude is None or longitude is None:
-        return False
-    if latitude < -90 or latitude > 90:
-        return False
-    if longitude < -180 or longitude > 180:
-        return False
-    return True
+    """Check if lat/lon are valid for PostGIS geometry (NaN is rejected)."""
+    return (
+        latitude is not None
+        and longitude is not None
+        and -90.0 <= latitude <= 90.0
+        and -180.0 <= longitude <= 180.0
+    )
 
 
 def upsert_float(
@@ -73,7 +85,9 @@ def upsert_float(
     Upsert a float record.
     
     Uses INSERT ... ON CONFLICT DO NOTHING to avoid duplicates.
-    If float exists, returns existing float_id.
+    If float exists, returns existing float_id. The insert and the lookup
+    run as one statement; a separate SELECT is only needed when a
+    concurrent transaction inserted the same float first.
     
     Args:
         db: Database session
@@ -91,22 +105,29 @@ def upsert_float(
     if wmo_id is None:
         wmo_id = platform_number
     
-    # PostgreSQL INSERT ... ON CONFLICT DO NOTHING
-    stmt = insert(Float).values(
-        platform_number=platform_number,
-        wmo_id=wmo_id,
-        float_type=float_type,
-    ).on_conflict_do_nothing(
-        index_elements=["platform_number"]
-    )
-    
-    db.execute(stmt)
-    db.flush()
+    existing = select(Float.float_id).where(Float.platform_number == platform_number)
     
-    # Fetch the float_id (whether newly inserted or existing)
+    # PostgreSQL INSERT ... ON CONFLICT DO NOTHING, returning the new id
+    # or, on conflict, the existing one
+    new_float = (
+        insert(Float)
+        .values(
+            platform_number=platform_number,
+            wmo_id=wmo_id,
+            float_type=float_type,
+        )
+        .on_conflict_do_nothing(index_elements=["platform_number"])
+        .returning(Float.float_id)
+        .cte("new_float")
+    )
     result = db.execute(
-        select(Float.float_id).where(Float.platform_number == platform_number)
-    ).scalar_one()
+        select(new_float.c.float_id).union_all(existing).limit(1)
+    ).scalar()
+    
+    # The statement snapshot cannot see a row committed by a concurrent
+    # insert that won the conflict; look it up again
+    if result is None:
+        result = db.execute(existing).scalar_one()
     
     log.debug(
         "float_upserted",
@@ -128,7 +149,8 @@ def upsert_profile(
     """
     Upsert a profile record with PostGIS geometry.
     
-    Uses INSERT ... ON CONFLICT DO UPDATE to handle re-ingestion.
+    Uses INSERT ... ON CONFLICT DO UPDATE ... RETURNING to handle
+    re-ingestion, so the row, its geometry and its id take one round trip.
     
     Args:
         db: Database session
@@ -167,6 +189,10 @@ def upsert_profile(
         "dataset_id": dataset_id,
         "updated_at": datetime.now(timezone.utc),
     }
+    if not position_invalid:
+        values["geom"] = func.ST_GeogFromText(
+            _create_point_geometry(profile_info.latitude, profile_info.longitude)
+        )
     
     # PostgreSQL INSERT ... ON CONFLICT DO UPDATE
     stmt = insert(Profile).values(**values)
@@ -183,33 +209,16 @@ def upsert_profile(
         "dataset_id": stmt.excluded.dataset_id,
         "updated_at": stmt.excluded.updated_at,
     }
+    # An invalid position leaves any previously stored geometry untouched
+    if not position_invalid:
+        update_dict["geom"] = stmt.excluded.geom
     
     stmt = stmt.on_conflict_do_update(
         constraint="uq_profiles_platform_cycle",
         set_=update_dict,
-    )
+    ).returning(Profile.profile_id)
     
-    db.execute(stmt)
-    db.flush()
-    
-    # Fetch the profile_id
-    profile_id = db.execute(
-        select(Profile.profile_id).where(
-            Profile.platform_number == platform_number,
-            Profile.cycle_number == profile_info.cycle_number,
-        )
-    ).scalar_one()
-    
-    # Update geometry separately using raw SQL (geoalchemy2 quirk with upserts)
-    if not position_invalid:
-        geom_wkt = f"POINT({profile_info.longitude} {profile_info.latitude})"
-        db.execute(
-            text(
-                "UPDATE profiles SET geom = ST_GeogFromText(:wkt) WHERE profile_id = :pid"
-            ),
-            {"wkt": geom_wkt, "pid": profile_id},
-        )
-        db.flush()
+    profile_id = db.execute(stmt).scalar_one()
     
     log.debug(
         "profile_upserted",
@@ -224,50 +233,68 @@ def upsert_profile(
 def write_measurements(
     db: Session,
     profile_id: int,
-    measurements: list[CleanedMeasurement],
+    measurements: CleanedMeasurementArray | list[CleanedMeasurement],
     job_id: Optional[str] = None,
+    batch_size: Optional[int] = None,
 ) -> int:
     """
     Write measurements for a profile using batch insert.
     
     Strategy:
     1. Delete all existing measurements for this profile
-    2. Batch insert new measurements using bulk_insert_mappings
+    2. Stream new measurements via COPY FROM STDIN when the connection
+       supports it (and the profile has at least DB_COPY_MIN_ROWS rows);
+       otherwise batch insert using bulk_insert_mappings
     
     This ensures measurements are always in sync after re-ingestion.
     
     Args:
         db: Database session
         profile_id: FK to profiles table
-        measurements: List of cleaned measurements
+        measurements: Column-wise cleaned measurements, or a list of them
         job_id: Optional job ID for logging
+        batch_size: Rows per bulk_insert_mappings call (defaults to
+            DB_INSERT_BATCH_SIZE)
     
     Returns:
         Number of measurements written
     """
     log = logger.bind(job_id=job_id) if job_id else logger
     
-    if not measurements:
+    if not len(measurements):
         log.debug("no_measurements_to_write", profile_id=profile_id)
         return 0
     
+    if not isinstance(measurements, CleanedMeasurementArray):
+        measurements = CleanedMeasurementArray.from_records(measurements)
+    
     # Step 1: Delete existing measurements for this profile
     delete_stmt = delete(Measurement).where(Measurement.profile_id == profile_id)
     db.execute(delete_stmt)
     db.flush()
     
-    # Step 2: Prepare measurement dicts for bulk insert
-    measurement_dicts = []
-    for m in measurements:
-        measurement_dicts.append({
+    # Stream through COPY in a single round trip where the driver allows it
+    if _supports_copy(db) and len(measurements) >= settings.DB_COPY_MIN_ROWS:
+        _copy_measurements(db, profile_id, measurements)
+        log.info(
+            "measurements_written",
+            profile_id=profile_id,
+            count=len(measurements),
+            method="copy",
+        )
+        return len(measurements)
+    
+    # Step 2: Prepare measurement dicts for bulk insert, zipping columns
+    measurement_dicts = [
+        {
             "profile_id": profile_id,
-            "pressure": m.pressure,
-            "temperature": m.temperature,
-            "salinity": m.salinity,
-            "dissolved_oxygen": m.oxygen,
-            "chlorophyll": m.chlorophyll_a,
-            "nitrate": m.nitrate,
-            "ph": m.ph,
+            "pressure": pressure,
+            "temperature": temperature,
+            "salinity": salinity,
+            "dissolved_oxygen": oxygen,
+            "chlorophyll": chlorophyll_a,
+            "nitrate": nitrate,
+            "ph": ph,
             # QC flags - not in CleanedMeasurement, set to None
             "pres_qc": None,
             "temp_qc": None,
@@ -277,11 +304,17 @@ def write_measurements(
             "nitrate_qc": None,
             "ph_qc": None,
             # Outlier flag from cleaner
-            "is_outlier": m.has_outlier,
-        })
+            "is_outlier": is_outlier,
+        }
+        for pressure, temperature, salinity, oxygen, chlorophyll_a, nitrate, ph, is_outlier in zip(
+            *(measurements.column(name) for name in MEASUREMENT_FIELDS),
+            measurements.is_outlier.tolist(),
+        )
+    ]
     
     # Step 3: Batch insert using bulk_insert_mappings
-    batch_size = settings.DB_INSERT_BATCH_SIZE
+    if batch_size is None:
+        batch_size = settings.DB_INSERT_BATCH_SIZE
     total_inserted = 0
     
     for i in range(0, len(measurement_dicts), batch_size):
@@ -308,6 +341,51 @@ def write_measurements(
     return total_inserted
 
 
+def _copy_value(value: Optional[float]) -> str:
+    """Format a measurement value as a CSV field for COPY (empty = NULL)."""
+    return "" if value is None else repr(float(value))
+
+
+def _supports_copy(db: Session) -> bool:
+    """Check whether the session is bound to PostgreSQL via a driver with COPY support."""
+    try:
+        bind = db.get_bind()
+    except AttributeError:
+        return False
+    return bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2"
+
+
+def _copy_measurements(
+    db: Session,
+    profile_id: int,
+    measurements: CleanedMeasurementArray,
+) -> None:
+    """
+    Write measurements with PostgreSQL COPY FROM STDIN.
+    
+    Uses the session's own DBAPI connection, so the rows are part of the
+    caller's transaction (no commit). CSV fields are formatted a column at
+    a time, in MEASUREMENT_FIELDS order (matching _MEASUREMENT_COPY_SQL).
+    """
+    columns = [
+        [_copy_value(value) for value in measurements.column(name)]
+        for name in MEASUREMENT_FIELDS
+    ]
+    columns.append(["t" if flag else "f" for flag in measurements.is_outlier.tolist()])
+    
+    buffer = io.StringIO()
+    buffer.writelines(
+        f"{profile_id},{','.join(fields)}\n" for fields in zip(*columns)
+    )
+    buffer.seek(0)
+    
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(_MEASUREMENT_COPY_SQL, buffer)
+    finally:
+        cursor.close()
+
+
 def upsert_float_position(
     db: Session,
     profile_info: ProfileInfo,
@@ -318,6 +396,7 @@ def upsert_float_position(
     Upsert a float position record for the lightweight spatial index.
     
     This is a denormalized copy of profile positions for fast map queries.
+    Written with a single INSERT ... ON CONFLICT DO UPDATE ... RETURNING.
     
     Args:
         db: Database session
@@ -347,6 +426,9 @@ def upsert_float_position(
         "timestamp": profile_info.timestamp,
         "latitude": profile_info.latitude,
         "longitude": profile_info.longitude,
+        "geom": func.ST_GeogFromText(
+            _create_point_geometry(profile_info.latitude, profile_info.longitude)
+        ),
     }
     
     stmt = insert(FloatPosition).values(**values)
@@ -355,33 +437,15 @@ def upsert_float_position(
         "timestamp": stmt.excluded.timestamp,
         "latitude": stmt.excluded.latitude,
         "longitude": stmt.excluded.longitude,
+        "geom": stmt.excluded.geom,
     }
     
     stmt = stmt.on_conflict_do_update(
         constraint="uq_float_positions_platform_cycle",
         set_=update_dict,
-    )
+    ).returning(FloatPosition.position_id)
     
-    db.execute(stmt)
-    db.flush()
-    
-    # Fetch the position_id
-    position_id = db.execute(
-        select(FloatPosition.position_id).where(
-            FloatPosition.platform_number == platform_number,
-            FloatPosition.cycle_number == profile_info.cycle_number,
-        )
-    ).scalar_one()
-    
-    # Update geometry separately
-    geom_wkt = f"POINT({profile_info.longitude} {profile_info.latitude})"
-    db.execute(
-        text(
-            "UPDATE float_positions SET geom = ST_GeogFromText(:wkt) WHERE position_id = :pid"
-        ),
-        {"wkt": geom_wkt, "pid": position_id},
-    )
-    db.flush()
+    position_id = db.execute(stmt).scalar_one()
     
     log.debug(
         "float_position_upserted",
@@ -23,6 +23,7 @@ from slowapi.middleware import SlowAPIMiddleware
 from app.config import settings
 from app.monitoring.metrics import reset_current_endpoint, set_current_endpoint
 from app.monitoring.sentry import init_sentry
+from app.query.validator import warm_validation_cache
 from app.rate_limiter import limiter
 from app.storage.s3 import get_s3_client
 
@@ -343,6 +344,9 @@ async def lifespan(app: FastAPI):
     )
     ensure_export_bucket(logger)
     
+    # Cache the few-shot example SQL and load sqlglot before the first query
+    logger.info("validator_cache_warmed", valid_examples=warm_validation_cache())
+    
     yield
     
     # Shutdown
@@ -9,8 +9,12 @@ Original SQL is never modified after validation (Hard Rule 8).
 LIMIT is applied by wrapping the original SQL as a subquery.
 """
 
+import json
+import re
+import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Any, Optional
 
 import structlog
 from sqlalchemy import text
@@ -18,15 +22,42 @@ from sqlalchemy.orm import Session
 
 log = structlog.get_logger(__name__)
 
+# EXPLAIN estimates keyed on (id(engine), normalized SQL).  Dashboards and
+# retry loops re-estimate the same statement, so a small bounded LRU skips
+# the planner round trip.  Entries expire after a short TTL because
+# ingestion runs in the Celery workers and changes the planner's row counts
+# without this process hearing about it.  Failed estimations are never cached.
+_ESTIMATE_CACHE: "OrderedDict[tuple[int, str], tuple[float, Optional[int]]]" = OrderedDict()
+_ESTIMATE_CACHE_MAX = 256
+_ESTIMATE_CACHE_TTL_SECONDS = 60.0
 
-@dataclass
+# Patterns compiled once at import rather than looked up per call
+_LIMIT_RE = re.compile(r"\blimit\s+\d+\b", re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@dataclass(slots=True)
 class ExecutionResult:
-    """Result of SQL execution."""
+    """
+    Result of SQL execution.  Slotted — one is built per query call.
+
+    Values are stored column-major: ``data[i]`` holds every value of
+    ``columns[i]``.  ``rows`` materializes the list-of-dicts view on first
+    access and reuses it afterwards.
+    """
     columns: list[str] = field(default_factory=list)
-    rows: list[dict] = field(default_factory=list)
+    data: list[list[Any]] = field(default_factory=list)
     row_count: int = 0
     truncated: bool = False   # True if results were limited
     error: Optional[str] = None
+    _rows: Optional[list[dict]] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def rows(self) -> list[dict]:
+        """Rows as dicts keyed by column name (built lazily, then cached)."""
+        if self._rows is None:
+            self._rows = [dict(zip(self.columns, values)) for values in zip(*self.data)]
+        return self._rows
 
 
 def execute_sql(
@@ -67,19 +98,23 @@ def execute_sql(
         # If the original SQL had no LIMIT and we hit max_rows, it's truncated
         truncated = len(raw_rows) >= max_rows and not _has_limit(sql)
 
-        rows = [dict(zip(columns, row)) for row in raw_rows]
+        # Transpose once into per-column lists
+        if raw_rows:
+            data = [list(values) for values in zip(*raw_rows)]
+        else:
+            data = [[] for _ in columns]
 
         log.info(
             "sql_executed",
-            row_count=len(rows),
+            row_count=len(raw_rows),
             column_count=len(columns),
             truncated=truncated,
         )
 
         return ExecutionResult(
             columns=columns,
-            rows=rows,
-            row_count=len(rows),
+            data=data,
+            row_count=len(raw_rows),
             truncated=truncated,
         )
 
@@ -107,6 +142,15 @@ def estimate_rows(sql: str, db: Session) -> Optional[int]:
     int or None
         Estimated total rows, or None if estimation fails.
     """
+    cache_key = _estimate_cache_key(sql, db)
+    cached = _ESTIMATE_CACHE.get(cache_key)
+    if cached is not None:
+        expires_at, estimated = cached
+        if time.monotonic() < expires_at:
+            _ESTIMATE_CACHE.move_to_end(cache_key)
+            return estimated
+        del _ESTIMATE_CACHE[cache_key]
+
     try:
         explain_sql = f"EXPLAIN (FORMAT JSON) {sql}"
         result = db.execute(text(explain_sql))
@@ -117,9 +161,9 @@ def estimate_rows(sql: str, db: Session) -> Optional[int]:
         # PostgreSQL returns a single row with a single column containing JSON
         plan_json = row[0]
 
-        # plan_json may be a string or already parsed (depends on driver)
-        if isinstance(plan_json, str):
-            import json
+        # psycopg2 decodes the json column already; other drivers may hand
+        # back the raw text or bytes
+        if isinstance(plan_json, (str, bytes)):
             plan_json = json.loads(plan_json)
 
         # The structure is: [{"Plan": {"Plan Rows": N, ...}, ...}]
@@ -128,17 +172,44 @@ def estimate_rows(sql: str, db: Session) -> Optional[int]:
             estimated = plan.get("Plan Rows")
             if estimated is not None:
                 log.debug("row_estimation", estimated_rows=int(estimated))
-                return int(estimated)
+                return _remember_estimate(cache_key, int(estimated))
 
-        return None
+        return _remember_estimate(cache_key, None)
 
     except Exception as exc:
         log.warning("row_estimation_failed", error=str(exc))
         return None
 
 
+estimate_rows.cache_clear = _ESTIMATE_CACHE.clear
+
+
 # ── Internal helpers ────────────────────────────────────────────────────────
 
+def _estimate_cache_key(sql: str, db: Session) -> tuple[int, str]:
+    """
+    Build the estimate cache key.
+
+    Keyed on the session's engine rather than the session itself: every
+    request gets a fresh readonly session, but they all share one engine,
+    and ``id()`` of a short-lived session can be recycled.
+    """
+    try:
+        bind = db.get_bind()
+    except Exception:
+        bind = db
+    return id(bind), _WHITESPACE_RE.sub(" ", sql).strip()
+
+
+def _remember_estimate(key: tuple[int, str], estimated: Optional[int]) -> Optional[int]:
+    """Store an estimate in the bounded LRU, stamped with its expiry, and return it."""
+    _ESTIMATE_CACHE[key] = (time.monotonic() + _ESTIMATE_CACHE_TTL_SECONDS, estimated)
+    _ESTIMATE_CACHE.move_to_end(key)
+    if len(_ESTIMATE_CACHE) > _ESTIMATE_CACHE_MAX:
+        _ESTIMATE_CACHE.popitem(last=False)
+    return estimated
+
+
 def _has_limit(sql: str) -> bool:
     """
     Quick check whether the SQL already contains a top-level LIMIT clause.
@@ -147,10 +218,9 @@ def _has_limit(sql: str) -> bool:
     """
     # Strip trailing whitespace and semicolons
     stripped = sql.strip().rstrip(";").strip()
-    # Check if the last token cluster contains LIMIT
-    # We look at the last ~50 characters to avoid false positives from subqueries
-    tail = stripped[-80:].upper()
-    return "LIMIT" in tail
+    # Check if the last token cluster contains LIMIT <n>
+    # We look at the last ~80 characters to avoid false positives from subqueries
+    return _LIMIT_RE.search(stripped, max(len(stripped) - 80, 0)) is not None
 
 
 def _apply_limit(sql: str, max_rows: int) -> str:
@@ -0,0 +1,326 @@
+"""
+FloatChat NL Query Engine — Fast SELECT Scanner
+
+Hand-written tokenizer + recursive-descent recognizer for the plain SELECT
+shape most generated queries take:
+
+    SELECT [DISTINCT] items FROM table [alias] [, table ...] [JOIN table ON expr]*
+        [WHERE expr] [GROUP BY exprs] [HAVING expr] [ORDER BY exprs] [LIMIT n] [OFFSET n] [;]
+
+It only ever answers "this is a plain SELECT over exactly these tables" or
+"not sure". Anything outside the subset — comments, quoted identifiers,
+subqueries, CTEs, set operations, schema-qualified names, function calls
+beyond a short harmless list, typed literals, any other keyword — makes it
+return None and the validator falls back to the full sqlglot pipeline.
+Read-only-ness follows from the grammar: the only statement it recognizes
+is a SELECT, and the SELECT keyword is never accepted anywhere else.
+"""
+
+import re
+from typing import Optional
+
+# Whitespace every supported PostgreSQL version's lexer skips. Unicode
+# spaces are identifier characters to PostgreSQL, and \v only became
+# whitespace in PostgreSQL 16, so neither is accepted here.
+_SPACE = " \t\n\r\f"
+
+# One token per match; anything the pattern cannot match ends the scan.
+# Character classes are spelled out in ASCII (and compiled with re.ASCII)
+# so no Unicode digit or space is read differently than PostgreSQL would.
+# Strings may not contain backslashes so their meaning does not depend on
+# standard_conforming_strings.
+_TOKEN_RE = re.compile(
+    r"""[ \t\n\r\f]*(?:
+        (?P<num>(?:[0-9]+(?:\.[0-9]*)?|\.[0-9]+)(?:[eE][+-]?[0-9]+)?)
+      | (?P<str>'(?:[^'\\]|'')*')
+      | (?P<ident>[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<op>::|<=|>=|<>|!=|\|\||[=<>+\-*/%(),.;])
+    )""",
+    re.VERBOSE | re.ASCII,
+)
+
+# PostgreSQL reserved words plus the non-reserved ones this grammar gives
+# meaning to. None of these is ever read as a table, column or alias name.
+_KEYWORDS = frozenset({
+    "all", "analyse", "analyze", "and", "any", "array", "as", "asc",
+    "asymmetric", "authorization", "between", "binary", "both", "by", "case", "cast",
+    "check", "collate", "collation", "column", "concurrently", "constraint",
+    "create", "cross", "current_catalog", "current_date", "current_role",
+    "current_schema", "current_time", "current_timestamp", "current_user",
+    "default", "deferrable", "desc", "distinct", "do", "else", "end", "escape",
+    "except", "exists", "false", "fetch", "filter", "first", "for", "foreign",
+    "freeze", "from", "full", "grant", "group", "having", "ilike", "in",
+    "initially", "inner", "intersect", "into", "is", "isnull", "join", "last",
+    "lateral", "leading", "left", "like", "limit", "localtime",
+    "localtimestamp", "natural", "not", "notnull", "null", "nulls", "offset",
+    "on", "only", "or", "order", "outer", "over", "overlaps", "placing",
+    "primary", "references", "returning", "right", "row", "select",
+    "session_user", "similar", "some", "symmetric", "table", "tablesample",
+    "then", "to", "trailing", "true", "union", "unique", "user", "using",
+    "values", "variadic", "verbose", "when", "where", "window", "with", "within",
+})
+
+# Functions that compute over their arguments without touching other tables
+_SAFE_FUNCTIONS = frozenset({
+    "count", "sum", "avg", "min", "max", "round", "abs", "coalesce", "lower", "upper",
+})
+
+_COMPARISON_OPS = frozenset({"=", "<>", "!=", "<", ">", "<=", ">="})
+_BINARY_OPS = _COMPARISON_OPS | {"+", "-", "*", "/", "%", "||"}
+
+
+class _Unsupported(Exception):
+    """Raised internally when the SQL leaves the supported subset."""
+
+
+def _tokenize(sql: str) -> Optional[list[tuple[str, str]]]:
+    """Split ``sql`` into ``(kind, text)`` tokens; None if any part is unsupported."""
+    tokens: list[tuple[str, str]] = []
+    pos = 0
+    end = len(sql.rstrip(_SPACE))
+    while pos < end:
+        match = _TOKEN_RE.match(sql, pos)
+        if match is None:
+            return None
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == "ident":
+            text = text.lower()
+            if text in _KEYWORDS:
+                kind = "kw"
+        tokens.append((kind, text))
+        pos = match.end()
+    return tokens
+
+
+class _Scanner:
+    """Recursive-descent recognizer over a token list, collecting table names."""
+
+    __slots__ = ("tokens", "pos", "tables")
+
+    def __init__(self, tokens: list[tuple[str, str]]) -> None:
+        self.tokens = tokens
+        self.pos = 0
+        self.tables: set[str] = set()
+
+    # ── Token helpers ───────────────────────────────────────────────────
+    def _peek(self, offset: int = 0) -> tuple[str, str]:
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else ("eof", "")
+
+    def _accept(self, kind: str, text: Optional[str] = None) -> bool:
+        tok_kind, tok_text = self._peek()
+        if tok_kind == kind and (text is None or tok_text == text):
+            self.pos += 1
+            return True
+        return False
+
+    def _expect(self, kind: str, text: Optional[str] = None) -> str:
+        tok_text = self._peek()[1]
+        if not self._accept(kind, text):
+            raise _Unsupported
+        return tok_text
+
+    # ── Statement ───────────────────────────────────────────────────────
+    def statement(self) -> None:
+        self._expect("kw", "select")
+        self._accept("kw", "distinct")
+        self._comma_list(self._select_item)
+
+        self._expect("kw", "from")
+        self._comma_list(self._table_ref)
+        while self._join():
+            pass
+
+        if self._accept("kw", "where"):
+            self._expr()
+        if self._accept("kw", "group"):
+            self._expect("kw", "by")
+            self._comma_list(self._expr)
+        if self._accept("kw", "having"):
+            self._expr()
+        if self._accept("kw", "order"):
+            self._expect("kw", "by")
+            self._comma_list(self._order_item)
+        if self._accept("kw", "limit"):
+            self._expect("num")
+        if self._accept("kw", "offset"):
+            self._expect("num")
+
+        self._accept("op", ";")
+        if self._peek()[0] != "eof":
+            raise _Unsupported
+
+    def _comma_list(self, item) -> None:
+        item()
+        while self._accept("op", ","):
+            item()
+
+    def _select_item(self) -> None:
+        if self._accept("op", "*"):
+            return
+        self._expr()
+        if self._accept("kw", "as"):
+            self._expect("ident")
+        else:
+            self._accept("ident")
+
+    def _table_ref(self) -> None:
+        name = self._expect("ident")
+        # schema.table or table(...) are left to the full parser
+        if self._peek()[1] in (".", "("):
+            raise _Unsupported
+        self.tables.add(name)
+        if self._accept("kw", "as"):
+            self._expect("ident")
+        else:
+            self._accept("ident")
+
+    def _join(self) -> bool:
+        kind, text = self._peek()
+        if kind != "kw":
+            return False
+        if text == "cross":
+            self.pos += 1
+            self._expect("kw", "join")
+            self._table_ref()
+            return True
+        if text in ("left", "right", "full"):
+            self.pos += 1
+            self._accept("kw", "outer")
+            self._expect("kw", "join")
+        elif text == "inner":
+            self.pos += 1
+            self._expect("kw", "join")
+        elif text == "join":
+            self.pos += 1
+        else:
+            return False
+        self._table_ref()
+        self._expect("kw", "on")
+        self._expr()
+        return True
+
+    def _order_item(self) -> None:
+        self._expr()
+        if not self._accept("kw", "asc"):
+            self._accept("kw", "desc")
+        if self._accept("kw", "nulls"):
+            if not self._accept("kw", "first"):
+                self._expect("kw", "last")
+
+    # ── Expressions ─────────────────────────────────────────────────────
+    def _expr(self) -> None:
+        self._unary()
+        while True:
+            kind, text = self._peek()
+            if (kind == "op" and text in _BINARY_OPS) or (kind == "kw" and text in ("and", "or")):
+                self.pos += 1
+                self._unary()
+            else:
+                return
+
+    def _unary(self) -> None:
+        while self._accept("kw", "not") or self._accept("op", "-") or self._accept("op", "+"):
+            pass
+        self._primary()
+        self._postfix()
+
+    def _primary(self) -> None:
+        kind, text = self._peek()
+        if kind in ("num", "str"):
+            self.pos += 1
+        elif kind == "kw" and text in ("null", "true", "false", "current_date", "current_timestamp"):
+            self.pos += 1
+        elif kind == "kw" and text == "case":
+            self.pos += 1
+            self._case()
+        elif kind == "op" and text == "(":
+            self.pos += 1
+            self._expr()
+            self._expect("op", ")")
+        elif kind == "ident":
+            self.pos += 1
+            if self._accept("op", "("):
+                self._call_args(text)
+            elif self._accept("op", "."):
+                if not self._accept("op", "*"):
+                    self._expect("ident")
+        else:
+            raise _Unsupported
+
+    def _call_args(self, func_name: str) -> None:
+        if func_name not in _SAFE_FUNCTIONS:
+            raise _Unsupported
+        if func_name == "count" and self._accept("op", "*"):
+            self._expect("op", ")")
+            return
+        self._accept("kw", "distinct")
+        self._comma_list(self._expr)
+        self._expect("op", ")")
+
+    def _case(self) -> None:
+        if self._peek() != ("kw", "when"):
+            self._expr()
+        self._expect("kw", "when")
+        self._expr()
+        self._expect("kw", "then")
+        self._expr()
+        while self._accept("kw", "when"):
+            self._expr()
+            self._expect("kw", "then")
+            self._expr()
+        if self._accept("kw", "else"):
+            self._expr()
+        self._expect("kw", "end")
+
+    def _postfix(self) -> None:
+        while True:
+            if self._accept("op", "::"):
+                self._expect("ident")
+            elif self._accept("kw", "is"):
+                self._accept("kw", "not")
+                kind, text = self._peek()
+                if kind != "kw" or text not in ("null", "true", "false"):
+                    raise _Unsupported
+                self.pos += 1
+            else:
+                negated = self._peek() == ("kw", "not")
+                if negated:
+                    self.pos += 1
+                if self._accept("kw", "in"):
+                    self._expect("op", "(")
+                    self._comma_list(self._expr)
+                    self._expect("op", ")")
+                elif self._accept("kw", "between"):
+                    self._unary()
+                    self._expect("kw", "and")
+                    self._unary()
+                elif self._accept("kw", "like") or self._accept("kw", "ilike"):
+                    self._unary()
+                elif negated:
+                    raise _Unsupported
+                else:
+                    return
+
+
+def simple_select_tables(sql: str) -> Optional[frozenset[str]]:
+    """
+    Return the lowercased tables read by ``sql`` if it is a single plain
+    SELECT in the supported subset, otherwise None.
+
+    A non-None result means the statement is read-only and reads only
+    those tables. None carries no verdict; use the full validator.
+    """
+    # Comments hide text from PostgreSQL that this scanner would still read
+    if "--" in sql or "/*" in sql:
+        return None
+    tokens = _tokenize(sql)
+    if not tokens:
+        return None
+    scanner = _Scanner(tokens)
+    try:
+        scanner.statement()
+    except _Unsupported:
+        return None
+    return frozenset(scanner.tables)
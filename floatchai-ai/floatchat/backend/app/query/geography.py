@@ -5,10 +5,12 @@ Scans a natural-language query for known geographic region names and returns
 bounding-box coordinates that the pipeline injects into the LLM prompt.
 
 The JSON lookup file is loaded once at module import time — never per request.
+The longest-first match order is also precomputed at load time.
 """
 
 import json
 import os
+import re
 from typing import Optional
 
 import structlog
@@ -18,6 +20,15 @@ log = structlog.get_logger(__name__)
 # ── Load geography lookup once at import time ───────────────────────────────
 _GEOGRAPHY_DATA: dict[str, dict] = {}
 
+# (name, resolved-result) pairs sorted by name length descending, so that
+# resolve_geography never re-sorts the lookup per request.
+_REGIONS: tuple[tuple[str, dict], ...] = ()
+
+# One compiled alternation over all names (longest first) plus each name's
+# position in _REGIONS, used to pick the winning match.
+_REGION_RE: Optional[re.Pattern] = None
+_REGION_RANK: dict[str, int] = {}
+
 _DEFAULT_PATH = os.path.join(
     os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
     "data",
@@ -41,8 +52,44 @@ def _load_geography(path: Optional[str] = None) -> dict[str, dict]:
         return {}
 
 
+def _build_regions(data: dict[str, dict]) -> tuple[tuple[str, dict], ...]:
+    """Precompute the longest-first (name, result) table for matching."""
+    return tuple(
+        (
+            name,
+            {
+                "name": name,
+                "lat_min": data[name]["lat_min"],
+                "lat_max": data[name]["lat_max"],
+                "lon_min": data[name]["lon_min"],
+                "lon_max": data[name]["lon_max"],
+            },
+        )
+        for name in sorted(data, key=len, reverse=True)
+    )
+
+
+def _build_matcher(
+    regions: tuple[tuple[str, dict], ...],
+) -> tuple[Optional[re.Pattern], dict[str, int]]:
+    """
+    Compile a single regex that reports every region name in a query.
+
+    The alternation sits inside a lookahead so the scan reports the
+    longest name starting at *every* position, not just non-overlapping
+    leftmost matches; the caller then picks the lowest-ranked one.
+    """
+    if not regions:
+        return None, {}
+    alternation = "|".join(re.escape(name) for name, _ in regions)
+    rank = {name: i for i, (name, _) in enumerate(regions)}
+    return re.compile(f"(?=({alternation}))"), rank
+
+
 # Load at import time
 _GEOGRAPHY_DATA = _load_geography()
+_REGIONS = _build_regions(_GEOGRAPHY_DATA)
+_REGION_RE, _REGION_RANK = _build_matcher(_REGIONS)
 
 
 def resolve_geography(query: str) -> Optional[dict]:
@@ -50,8 +97,9 @@ def resolve_geography(query: str) -> Optional[dict]:
     Scan a natural-language query for known geography names.
 
     Matching is case-insensitive substring search against all keys in the
-    lookup table.  Returns the *first* match found (longest key first to
-    prefer specific regions like "south china sea" over "china sea").
+    lookup table, done with one precompiled regex.  Returns the longest
+    matching key (to prefer specific regions like "south china sea" over
+    "china sea").
 
     Parameters
     ----------
@@ -65,25 +113,23 @@ def resolve_geography(query: str) -> Optional[dict]:
           "lon_min": float, "lon_max": float}``
         or ``None`` if no geography is detected.
     """
-    if not _GEOGRAPHY_DATA or not query:
+    if _REGION_RE is None or not query:
         return None
 
-    query_lower = query.lower()
+    # _REGIONS is longest-first, so its last name is the shortest; a query
+    # shorter than that cannot contain any region and skips the scan
+    if len(query) < len(_REGIONS[-1][0]):
+        return None
 
-    # Sort by key length descending so "south china sea" matches before
-    # "china sea" or "sea"
-    for name in sorted(_GEOGRAPHY_DATA, key=len, reverse=True):
-        if name in query_lower:
-            bbox = _GEOGRAPHY_DATA[name]
-            return {
-                "name": name,
-                "lat_min": bbox["lat_min"],
-                "lat_max": bbox["lat_max"],
-                "lon_min": bbox["lon_min"],
-                "lon_max": bbox["lon_max"],
-            }
+    # One C-level scan collects every candidate; _REGIONS is sorted by key
+    # length descending, so the lowest rank is the longest match and
+    # "south china sea" wins over "china sea" or "sea"
+    matches = _REGION_RE.findall(query.lower())
+    if not matches:
+        return None
 
-    return None
+    best = min(_REGION_RANK[name] for name in matches)
+    return dict(_REGIONS[best][1])
 
 
 def reload_geography(path: Optional[str] = None) -> int:
@@ -93,6 +139,8 @@ def reload_geography(path: Optional[str] = None) -> int:
 
     Returns the number of entries loaded.
     """
-    global _GEOGRAPHY_DATA
+    global _GEOGRAPHY_DATA, _REGIONS, _REGION_RE, _REGION_RANK
     _GEOGRAPHY_DATA = _load_geography(path)
+    _REGIONS = _build_regions(_GEOGRAPHY_DATA)
+    _REGION_RE, _REGION_RANK = _build_matcher(_REGIONS)
     return len(_GEOGRAPHY_DATA)
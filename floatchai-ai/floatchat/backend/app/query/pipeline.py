@@ -15,9 +15,11 @@ Pipeline flow:
 Context is NOT stored here — that happens in the API layer (Gap 3).
 """
 
+import asyncio
 import re
 import time
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Optional
 from uuid import UUID
 
@@ -79,6 +81,9 @@ def get_llm_client(provider: str, settings) -> OpenAI:
     """
     Factory function — returns an OpenAI-compatible client for the provider.
 
+    Clients are cached per (api_key, base_url) so repeated calls reuse one
+    client and its pooled HTTP connections.
+
     Parameters
     ----------
     provider : str
@@ -112,22 +117,45 @@ def get_llm_client(provider: str, settings) -> OpenAI:
             f"Set the {config['key_attr']} environment variable."
         )
 
-    kwargs = {"api_key": api_key}
+    base_url = None
     if config["base_url_attr"] is not None:
-        base_url = getattr(settings, config["base_url_attr"], None)
-        if base_url:
-            kwargs["base_url"] = base_url
+        base_url = getattr(settings, config["base_url_attr"], None) or None
+
+    return _build_client(api_key, base_url)
 
+
+@lru_cache(maxsize=8)
+def _build_client(api_key: str, base_url: Optional[str]) -> OpenAI:
+    """Construct (once per key/endpoint pair) the OpenAI-compatible client."""
+    kwargs = {"api_key": api_key}
+    if base_url:
+        kwargs["base_url"] = base_url
     return OpenAI(**kwargs)
 
 
 def _get_model(provider: str, model_override: Optional[str], settings) -> str:
     """Resolve the model name for a provider."""
+    return _resolve_model(
+        provider,
+        model_override,
+        settings.QUERY_LLM_PROVIDER,
+        settings.QUERY_LLM_MODEL,
+    )
+
+
+@lru_cache(maxsize=32)
+def _resolve_model(
+    provider: str,
+    model_override: Optional[str],
+    default_provider: str,
+    default_model: str,
+) -> str:
+    """Pure model lookup behind _get_model, cached on the settings it reads."""
     if model_override:
         return model_override
     # Use the configured QUERY_LLM_MODEL if the provider matches the default
-    if provider.lower() == settings.QUERY_LLM_PROVIDER.lower():
-        return settings.QUERY_LLM_MODEL
+    if provider.lower() == default_provider.lower():
+        return default_model
     # Otherwise use the provider's default model
     return _PROVIDER_CONFIG.get(provider.lower(), {}).get("default_model", "gpt-4o")
 
@@ -162,11 +190,12 @@ def _build_messages(
 
     # Inject geography context if resolved
     if geography:
-        geo_msg = (
-            f"\n[Geography detected: {geography['name']}]\n"
-            f"Bounding box: lat {geography['lat_min']}–{geography['lat_max']}, "
-            f"lon {geography['lon_min']}–{geography['lon_max']}\n"
-            f"Use these coordinates for spatial filtering."
+        geo_msg = _format_geography_message(
+            geography["name"],
+            geography["lat_min"],
+            geography["lat_max"],
+            geography["lon_min"],
+            geography["lon_max"],
         )
         messages.append({"role": "system", "content": geo_msg})
 
@@ -194,6 +223,28 @@ def _build_messages(
     return messages
 
 
+@lru_cache(maxsize=64)
+def _format_geography_message(
+    name: str,
+    lat_min: float,
+    lat_max: float,
+    lon_min: float,
+    lon_max: float,
+) -> str:
+    """
+    Format the geography system addendum.
+
+    Cached per bounding box: regions come from a fixed lookup table, and
+    every retry of a query re-sends the same geography message.
+    """
+    return (
+        f"\n[Geography detected: {name}]\n"
+        f"Bounding box: lat {lat_min}–{lat_max}, "
+        f"lon {lon_min}–{lon_max}\n"
+        f"Use these coordinates for spatial filtering."
+    )
+
+
 # ── SQL extraction ──────────────────────────────────────────────────────────
 
 # Pattern to find ```sql ... ``` blocks
@@ -213,12 +264,14 @@ def _extract_sql(response_text: str) -> Optional[str]:
       1. ```sql ... ``` code block
       2. Raw SELECT/WITH statement
     """
-    # Try code block first
-    match = _SQL_BLOCK_RE.search(response_text)
-    if match:
-        sql = match.group(1).strip()
-        if sql:
-            return sql
+    # Try code block first; a substring check skips the regex scan for
+    # responses that contain no fence at all
+    if "```" in response_text:
+        match = _SQL_BLOCK_RE.search(response_text)
+        if match:
+            sql = match.group(1).strip()
+            if sql:
+                return sql
 
     # Fallback to raw SELECT
     match = _RAW_SELECT_RE.search(response_text)
@@ -325,7 +378,10 @@ async def nl_to_sql(
         # Call LLM
         try:
             llm_started_at = time.perf_counter()
-            response = client.chat.completions.create(
+            # The OpenAI client is synchronous; run it in a worker thread so
+            # the event loop keeps serving other requests during the call
+            response = await asyncio.to_thread(
+                client.chat.completions.create,
                 model=active_model,
                 messages=messages,
                 temperature=settings.QUERY_LLM_TEMPERATURE,
@@ -492,10 +548,13 @@ async def interpret_results(
         f"Results ({row_count} rows):\n{preview_text}"
     )
 
+    model_name = _get_model(settings.QUERY_LLM_PROVIDER, None, settings)
+
     try:
         llm_started_at = time.perf_counter()
-        response = client.chat.completions.create(
-            model=_get_model(settings.QUERY_LLM_PROVIDER, None, settings),
+        response = await asyncio.to_thread(
+            client.chat.completions.create,
+            model=model_name,
             messages=[
                 {"role": "system", "content": system_msg},
                 {"role": "user", "content": user_msg},
@@ -506,7 +565,7 @@ async def interpret_results(
         observe_llm_call_duration(
             time.perf_counter() - llm_started_at,
             provider=settings.QUERY_LLM_PROVIDER,
-            model=_get_model(settings.QUERY_LLM_PROVIDER, None, settings),
+            model=model_name,
         )
         interpretation = response.choices[0].message.content or ""
         return interpretation.strip()
@@ -515,7 +574,7 @@ async def interpret_results(
         observe_llm_call_duration(
             max(time.perf_counter() - llm_started_at, 0.0),
             provider=settings.QUERY_LLM_PROVIDER,
-            model=_get_model(settings.QUERY_LLM_PROVIDER, None, settings),
+            model=model_name,
         )
         log.warning("interpretation_failed", error=str(exc))
         return _fallback_interpretation(row_count, columns)
@@ -6,11 +6,14 @@ LLM when generating SQL from natural language.  This string is built once
 at import time and never rebuilt per request (Hard Rule 3).
 
 Also exports ALLOWED_TABLES — the set of table names the validator uses
-for the whitelist check.
+for the whitelist check — and CANONICAL_EXAMPLES, the prompt's few-shot
+SQL used to warm the validator cache at startup.
 """
 
+import re
+
 # ── Allowed tables (used by validator.py for whitelist check) ───────────────
-ALLOWED_TABLES: set[str] = {
+ALLOWED_TABLES: frozenset[str] = frozenset({
     "floats",
     "datasets",
     "profiles",
@@ -25,7 +28,7 @@ ALLOWED_TABLES: set[str] = {
     "gdac_sync_runs",
     "mv_float_latest_position",
     "mv_dataset_stats",
-}
+})
 
 # ── Schema Prompt ───────────────────────────────────────────────────────────
 SCHEMA_PROMPT: str = r"""You are an expert PostgreSQL/PostGIS SQL generator for the FloatChat oceanographic database.
@@ -668,14 +671,23 @@ Use them to resolve references like "the same float", "those profiles",
 """
 
 
+# The few-shot SQL blocks of SCHEMA_PROMPT, extracted once so the validator
+# is warmed with exactly the statements the LLM is shown
+CANONICAL_EXAMPLES: tuple[str, ...] = tuple(
+  block.strip() for block in re.findall(r"```sql\n(.*?)```", SCHEMA_PROMPT, re.DOTALL)
+)
+
+
+# API-key requests get the same prompt plus a public-dataset constraint,
+# also built once at import time rather than per call.
+_SCOPED_SCHEMA_PROMPT: str = (
+  f"{SCHEMA_PROMPT}\n\n"
+  "SECURITY CONSTRAINT FOR API KEY REQUESTS:\n"
+  "MANDATORY: Any query that references the datasets table MUST include "
+  "the filter datasets.is_public = true. This rule is absolute and cannot be omitted."
+)
+
+
 def get_schema_prompt(api_key_scoped: bool = False) -> str:
   """Return schema prompt, optionally enforcing public-dataset-only access."""
-  if not api_key_scoped:
-    return SCHEMA_PROMPT
-
-  return (
-    f"{SCHEMA_PROMPT}\n\n"
-    "SECURITY CONSTRAINT FOR API KEY REQUESTS:\n"
-    "MANDATORY: Any query that references the datasets table MUST include "
-    "the filter datasets.is_public = true. This rule is absolute and cannot be omitted."
-  )
+  return _SCOPED_SCHEMA_PROMPT if api_key_scoped else SCHEMA_PROMPT
@@ -1,68 +1,192 @@
 """
 FloatChat NL Query Engine — SQL Validator
 
-Three-check validation pipeline plus geography cast warning.
-All checks use sqlglot AST inspection — no regex-based SQL parsing.
-
-Checks (run sequentially):
-  1. Syntax     — parse with sqlglot (postgres dialect)
+Three-check validation pipeline plus geography cast warning. Checks run
+in this order; the first one that reaches a verdict returns it:
+
+Fast paths (no sqlglot parse):
+  a. Leading write — a regex rejects any statement whose first keyword
+     (after comments) is a write or DDL verb
+  b. Plain SELECT — the hand-written scanner in app.query.fast_validator
+     recognizes single-level SELECT / JOIN queries and reports their
+     tables, which then only need the whitelist lookup; when it is unsure
+     it returns None and the statement falls through to sqlglot
+
+sqlglot AST checks (postgres dialect):
+  1. Syntax     — parse the statement
   2. Read-only  — walk AST, reject anything that isn't SELECT/WITH (Hard Rule 4)
   3. Whitelist  — extract all table names, reject if any not in ALLOWED_TABLES
 
 Additional:
   4. Geography cast warning — flag ST_DWithin / ST_MakePoint without ::geography
+
+Results are memoized per (whitespace-normalized sql, allowed_tables); call
+validate_sql.cache_clear() to reset.
+
+sqlglot takes ~100 ms to import, so it is loaded on the first parse rather
+than when the pipeline imports this module (see _sqlglot).
 """
 
+from __future__ import annotations
+
+import re
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Optional
+from functools import lru_cache
+from types import ModuleType
+from typing import TYPE_CHECKING, Iterable, Optional
 
 import structlog
-import sqlglot
-from sqlglot import exp as expressions
 
-from app.query.schema_prompt import ALLOWED_TABLES
+from app.query.fast_validator import simple_select_tables
+from app.query.schema_prompt import ALLOWED_TABLES, CANONICAL_EXAMPLES
+
+if TYPE_CHECKING:
+    from sqlglot import exp as expressions
+    from sqlglot.dialects.dialect import Dialect
 
 log = structlog.get_logger(__name__)
 
 
 # ── Result dataclass ────────────────────────────────────────────────────────
-@dataclass
+@dataclass(frozen=True)
 class ValidationResult:
-    """Result of SQL validation."""
+    """Result of SQL validation. Frozen — cached instances are shared."""
     valid: bool
     error: Optional[str] = None          # Human-readable error message
     check_failed: Optional[str] = None   # "syntax" | "readonly" | "whitelist" | None
-    warnings: list[str] = field(default_factory=list)  # e.g., geography cast warnings
-
-
-# ── Statement types that are allowed (read-only) ───────────────────────────
-_READONLY_TYPES = (
-    expressions.Select,
-    expressions.Union,
-    expressions.Intersect,
-    expressions.Except,
-    expressions.Subquery,
-    expressions.CTE,
-    expressions.With,
+    warnings: tuple[str, ...] = ()  # e.g., geography cast warnings
+
+
+# ── Lazily loaded sqlglot ───────────────────────────────────────────────────
+@dataclass(frozen=True, slots=True)
+class _Sqlglot:
+    """The parts of sqlglot the validator uses."""
+    exp: ModuleType
+    parse_error: type[Exception]
+    dialect: Dialect
+    readonly_types: tuple[type, ...]   # Statement types that are allowed
+    write_types: tuple[type, ...]      # Statement types that are explicitly forbidden
+
+
+@lru_cache(maxsize=None)
+def _sqlglot() -> _Sqlglot:
+    """Import sqlglot and resolve the postgres dialect, once per process."""
+    from sqlglot import exp
+    from sqlglot.dialects.dialect import Dialect
+    from sqlglot.errors import ParseError
+
+    return _Sqlglot(
+        exp=exp,
+        parse_error=ParseError,
+        dialect=Dialect.get_or_raise("postgres"),
+        readonly_types=(
+            exp.Select,
+            exp.Union,
+            exp.Intersect,
+            exp.Except,
+            exp.Subquery,
+            exp.CTE,
+            exp.With,
+        ),
+        write_types=(
+            exp.Insert,
+            exp.Update,
+            exp.Delete,
+            exp.Drop,
+            exp.Create,
+            exp.Alter,
+            exp.Merge,
+            exp.TruncateTable,
+            exp.Grant,
+            exp.Revoke,
+            exp.Command,  # catches other DDL/DCL commands
+        ),
+    )
+
+# Leading write keyword (after any comments) — these can never be read-only,
+# so they are rejected without paying for a sqlglot parse
+_LEADING_WRITE_RE = re.compile(
+    r"\A\s*(?:--[^\n]*(?:\n|\Z)\s*|/\*.*?\*/\s*)*"
+    r"(INSERT|UPDATE|DELETE|DROP|CREATE|ALTER|TRUNCATE|GRANT|REVOKE|MERGE)\b",
+    re.IGNORECASE | re.DOTALL,
 )
 
-# Statement types that are explicitly forbidden
-_WRITE_TYPES = (
-    expressions.Insert,
-    expressions.Update,
-    expressions.Delete,
-    expressions.Drop,
-    expressions.Create,
-    expressions.Alter,
-    expressions.Merge,
-    expressions.TruncateTable,
-    expressions.Grant,
-    expressions.Revoke,
-    expressions.Command,  # catches other DDL/DCL commands
+# Lowercased once so the whitelist check is a plain set difference
+_ALLOWED_TABLES_LOWER = frozenset(t.lower() for t in ALLOWED_TABLES)
+
+# Validation is a pure function of (sql, whitelist); the pipeline and its
+# retries re-validate identical SQL, so results are kept in a bounded LRU
+_VALIDATION_CACHE: "OrderedDict[tuple[str, Optional[frozenset[str]]], ValidationResult]" = (
+    OrderedDict()
 )
+_VALIDATION_CACHE_MAX = 1024
+
+# Parsed statements, keyed like the result cache but independent of the
+# whitelist; bounded lower because trees are much larger than results
+_PARSE_CACHE: "OrderedDict[str, tuple[Optional[expressions.Expression], ...]]" = OrderedDict()
+_PARSE_CACHE_MAX = 256
+
+# Whitespace runs, for cache keys only (see _cache_key_sql)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+# ── Parsing ─────────────────────────────────────────────────────────────────
+# sqlglot.parse builds a fresh Tokenizer and Parser on every call. Both reset
+# their state per parse but are not thread-safe, so each thread keeps one pair.
+_PARSER_STATE = threading.local()
+
+
+def _parse(sql: str) -> list[Optional[expressions.Expression]]:
+    """Parse ``sql`` with this thread's reusable postgres tokenizer/parser."""
+    state = _PARSER_STATE
+    if not hasattr(state, "parser"):
+        dialect = _sqlglot().dialect
+        state.tokenizer = dialect.tokenizer_class(dialect=dialect)
+        state.parser = dialect.parser()
+    return state.parser.parse(state.tokenizer.tokenize(sql), sql)
+
+
+def _cache_key_sql(sql: str) -> str:
+    """
+    Canonical form of ``sql`` for cache keys — never parsed.
+
+    Strips the ends and collapses each whitespace run to one space, or to
+    one newline if the run contains a line break. Keeping the line break
+    matters: it is what ends a ``--`` comment, so folding it into a space
+    could make two statements with different tables share a key.
+    """
+    return _WHITESPACE_RE.sub(
+        lambda m: "\n" if "\n" in m.group() or "\r" in m.group() else " ",
+        sql.strip(),
+    )
+
+
+def _parse_cached(sql: str) -> tuple[Optional[expressions.Expression], ...]:
+    """
+    Parse ``sql`` once per canonical form, independent of the whitelist
+    the result cache is keyed on. The original string is what gets parsed.
+    The trees are shared between callers and must be treated as read-only.
+    """
+    key = _cache_key_sql(sql)
+    if key in _PARSE_CACHE:
+        _PARSE_CACHE.move_to_end(key)
+        return _PARSE_CACHE[key]
+
+    statements = tuple(_parse(sql))
+    _PARSE_CACHE[key] = statements
+    if len(_PARSE_CACHE) > _PARSE_CACHE_MAX:
+        _PARSE_CACHE.popitem(last=False)
+    return statements
 
 
-def validate_sql(sql: str, allowed_tables: Optional[set[str]] = None) -> ValidationResult:
+_parse_cached.cache_clear = _PARSE_CACHE.clear
+
+
+def validate_sql(
+    sql: str, allowed_tables: Optional[Iterable[str]] = None
+) -> ValidationResult:
     """
     Run the 3-check validation pipeline on a SQL string.
 
@@ -70,20 +194,81 @@ def validate_sql(sql: str, allowed_tables: Optional[set[str]] = None) -> Validat
     ----------
     sql : str
         The SQL string to validate.
-    allowed_tables : set[str] or None
+    allowed_tables : iterable of str or None
         Table whitelist.  Defaults to ALLOWED_TABLES from schema_prompt.
+        Matched case-insensitively.
 
     Returns
     -------
     ValidationResult
     """
+    allowed = None
+    if allowed_tables is not None:
+        allowed = frozenset(t.lower() for t in allowed_tables)
+
+    cache_key = (_cache_key_sql(sql), allowed)
+    if cache_key in _VALIDATION_CACHE:
+        _VALIDATION_CACHE.move_to_end(cache_key)
+        return _VALIDATION_CACHE[cache_key]
+
+    result = _validate_sql_uncached(sql, allowed)
+    _VALIDATION_CACHE[cache_key] = result
+    if len(_VALIDATION_CACHE) > _VALIDATION_CACHE_MAX:
+        _VALIDATION_CACHE.popitem(last=False)
+    return result
+
+
+validate_sql.cache_clear = _VALIDATION_CACHE.clear
+
+
+def warm_validation_cache(statements: Iterable[str] = CANONICAL_EXAMPLES) -> int:
+    """
+    Validate ``statements`` ahead of traffic so their results and parse
+    trees are cached and sqlglot is already loaded. Called at app startup
+    with the schema prompt's few-shot examples.
+
+    Returns the number of statements that passed validation.
+    """
+    return sum(validate_sql(sql).valid for sql in statements)
+
+
+def _validate_sql_uncached(
+    sql: str, allowed_tables: Optional[frozenset[str]]
+) -> ValidationResult:
+    """
+    Run the validation pipeline without consulting the result cache.
+
+    ``allowed_tables`` must already be lowercased; None means ALLOWED_TABLES.
+    """
     if allowed_tables is None:
-        allowed_tables = ALLOWED_TABLES
+        allowed_tables = _ALLOWED_TABLES_LOWER
+
+    # ── Fast path: obvious write statements ─────────────────────────────
+    write_match = _LEADING_WRITE_RE.match(sql)
+    if write_match:
+        return ValidationResult(
+            valid=False,
+            error=f"Only SELECT statements are allowed. Got: {write_match.group(1).upper()}",
+            check_failed="readonly",
+        )
+
+    # ── Fast path: plain SELECT ... FROM ... [JOIN ...] ─────────────────
+    fast_tables = simple_select_tables(sql)
+    if fast_tables is not None:
+        disallowed = fast_tables - allowed_tables
+        if not disallowed:
+            return ValidationResult(valid=True)
+        return ValidationResult(
+            valid=False,
+            error=f"Referenced tables not in whitelist: {', '.join(sorted(disallowed))}",
+            check_failed="whitelist",
+        )
 
     # ── Check 1: Syntax ──────────────────────────────────────────────────
+    sqlglot = _sqlglot()
     try:
-        parsed = sqlglot.parse(sql, dialect="postgres")
-    except sqlglot.errors.ParseError as exc:
+        parsed = _parse_cached(sql)
+    except sqlglot.parse_error as exc:
         return ValidationResult(
             valid=False,
             error=f"SQL syntax error: {exc}",
@@ -110,78 +295,115 @@ def validate_sql(sql: str, allowed_tables: Optional[set[str]] = None) -> Validat
     tree = statements[0]
 
     # ── Check 2: Read-only (AST inspection, Hard Rule 4) ────────────────
-    readonly_result = _check_readonly(tree)
+    # The root type is checked first so most rejected statements never pay
+    # for the tree walk
+    readonly_result = _check_readonly_root(tree)
+    if not readonly_result.valid:
+        return readonly_result
+
+    # One walk gathers everything the remaining checks need; writes nested
+    # under a read-only root (e.g. a data-modifying CTE) are caught here
+    facts = _scan_tree(tree)
+    readonly_result = _check_no_write_nodes(facts.write_node)
     if not readonly_result.valid:
         return readonly_result
 
     # ── Check 3: Table whitelist ─────────────────────────────────────────
-    whitelist_result = _check_whitelist(tree, allowed_tables)
+    whitelist_result = _check_whitelist(facts, allowed_tables)
     if not whitelist_result.valid:
         return whitelist_result
 
     # ── Additional: Geography cast warning ───────────────────────────────
-    warnings = _check_geography_casts(tree)
+    warnings = _check_geography_casts(facts.spatial_calls)
 
     return ValidationResult(valid=True, warnings=warnings)
 
 
 # ── Internal check functions ────────────────────────────────────────────────
 
-def _check_readonly(tree: expressions.Expression) -> ValidationResult:
+# Spatial functions the geography cast warning inspects
+_SPATIAL_FUNCTIONS = frozenset({"st_dwithin", "st_makepoint", "st_contains", "st_within"})
+
+
+@dataclass(slots=True)
+class _TreeFacts:
+    """What the checks need from the AST, gathered in a single walk."""
+    write_node: Optional[expressions.Expression] = None
+    tables: set[str] = field(default_factory=set)
+    cte_aliases: set[str] = field(default_factory=set)
+    spatial_calls: list[tuple[str, expressions.Expression]] = field(default_factory=list)
+
+
+def _scan_tree(tree: expressions.Expression) -> _TreeFacts:
     """
-    Walk the AST and reject if any node is a write operation.
+    Walk the AST once, recording the first write node, referenced table
+    names, CTE aliases and spatial function calls.
+
+    Stops at the first write node — the read-only check fails before the
+    other checks would look at anything else.
+    """
+    sqlglot = _sqlglot()
+    exp = sqlglot.exp
+    facts = _TreeFacts()
+    for node in tree.walk():
+        # Older sqlglot releases yield (expression, parent, key) tuples
+        if isinstance(node, tuple):
+            node = node[0]
+        if isinstance(node, sqlglot.write_types):
+            facts.write_node = node
+            break
+        if isinstance(node, exp.Table):
+            if node.name:
+                facts.tables.add(node.name.lower())
+        elif isinstance(node, exp.CTE):
+            if node.alias:
+                facts.cte_aliases.add(node.alias.lower())
+        elif isinstance(node, exp.Anonymous):
+            func_name = node.name.lower() if node.name else ""
+            if func_name in _SPATIAL_FUNCTIONS:
+                facts.spatial_calls.append((func_name, node))
+    return facts
+
+
+def _check_readonly_root(tree: expressions.Expression) -> ValidationResult:
+    """
+    Reject unless the top-level statement is read-only.
     Uses AST node types, not string matching (Hard Rule 4).
     """
     # The top-level statement must be a SELECT (or WITH ... SELECT, UNION, etc.)
-    if not isinstance(tree, (*_READONLY_TYPES,)):
+    if not isinstance(tree, _sqlglot().readonly_types):
         return ValidationResult(
             valid=False,
             error=f"Only SELECT statements are allowed. Got: {type(tree).__name__}",
             check_failed="readonly",
         )
 
-    # Walk all descendants looking for forbidden write nodes
-    for node in tree.walk():
-        # node is a tuple (expression, parent, key) in walk()
-        # Actually sqlglot walk yields Expression objects directly
-        if isinstance(node, tuple):
-            node = node[0]
-        if isinstance(node, _WRITE_TYPES):
-            return ValidationResult(
-                valid=False,
-                error=f"Write operation detected: {type(node).__name__}. Only SELECT is allowed.",
-                check_failed="readonly",
-            )
+    return ValidationResult(valid=True)
+
+
+def _check_no_write_nodes(
+    write_node: Optional[expressions.Expression],
+) -> ValidationResult:
+    """Reject if the tree walk found a write operation anywhere."""
+    if write_node is not None:
+        return ValidationResult(
+            valid=False,
+            error=f"Write operation detected: {type(write_node).__name__}. Only SELECT is allowed.",
+            check_failed="readonly",
+        )
 
     return ValidationResult(valid=True)
 
 
 def _check_whitelist(
-    tree: expressions.Expression,
-    allowed_tables: set[str],
+    facts: _TreeFacts,
+    allowed_tables: frozenset[str],
 ) -> ValidationResult:
     """
-    Extract all table names referenced in the AST and verify they are
-    in the allowed set.
+    Verify every referenced table is in the allowed set (already
+    lowercased). CTE aliases are not real tables and are excluded.
     """
-    referenced_tables: set[str] = set()
-
-    for table_node in tree.find_all(expressions.Table):
-        table_name = table_node.name
-        if table_name:
-            referenced_tables.add(table_name.lower())
-
-    # Exclude CTE aliases from the whitelist check — they are not real tables
-    cte_aliases: set[str] = set()
-    for cte_node in tree.find_all(expressions.CTE):
-        alias = cte_node.alias
-        if alias:
-            cte_aliases.add(alias.lower())
-
-    # Subquery aliases should also be excluded
-    real_tables = referenced_tables - cte_aliases
-
-    disallowed = real_tables - {t.lower() for t in allowed_tables}
+    disallowed = facts.tables - facts.cte_aliases - allowed_tables
     if disallowed:
         return ValidationResult(
             valid=False,
@@ -192,32 +414,32 @@ def _check_whitelist(
     return ValidationResult(valid=True)
 
 
-def _check_geography_casts(tree: expressions.Expression) -> list[str]:
+def _check_geography_casts(
+    spatial_calls: list[tuple[str, expressions.Expression]],
+) -> tuple[str, ...]:
     """
-    Scan the AST for ST_DWithin / ST_MakePoint calls and warn if the
-    arguments are not cast to ::geography.
+    Warn when ST_DWithin / ST_Contains / ST_Within calls are missing the
+    ::geography / ::geometry cast.
 
     This is advisory only — not a hard failure.
     """
     warnings: list[str] = []
 
-    for func_node in tree.find_all(expressions.Anonymous):
-        func_name = func_node.name.lower() if hasattr(func_node, "name") and func_node.name else ""
-        if func_name in ("st_dwithin", "st_makepoint", "st_contains", "st_within"):
-            # Check if any argument is cast to geography or geometry
-            sql_fragment = func_node.sql(dialect="postgres")
-            if func_name == "st_dwithin" and "::geography" not in sql_fragment:
-                warnings.append(
-                    "ST_DWithin used without ::geography cast. "
-                    "For distance calculations, cast arguments to ::geography."
-                )
-            if func_name in ("st_contains", "st_within") and "::geometry" not in sql_fragment:
-                warnings.append(
-                    f"{func_name.upper()} used without ::geometry cast. "
-                    "For containment checks, cast arguments to ::geometry."
-                )
-
-    return warnings
+    for func_name, func_node in spatial_calls:
+        # Check if any argument is cast to geography or geometry
+        sql_fragment = func_node.sql(dialect="postgres")
+        if func_name == "st_dwithin" and "::geography" not in sql_fragment:
+            warnings.append(
+                "ST_DWithin used without ::geography cast. "
+                "For distance calculations, cast arguments to ::geography."
+            )
+        if func_name in ("st_contains", "st_within") and "::geometry" not in sql_fragment:
+            warnings.append(
+                f"{func_name.upper()} used without ::geometry cast. "
+                "For containment checks, cast arguments to ::geometry."
+            )
+
+    return tuple(warnings)
 
 
 def enforce_public_dataset_scope(sql: str) -> ValidationResult:
@@ -226,9 +448,13 @@ def enforce_public_dataset_scope(sql: str) -> ValidationResult:
 
     This is an additional security check used for API-key-scoped requests.
     """
+    sqlglot = _sqlglot()
     try:
-        parsed = sqlglot.parse_one(sql, dialect="postgres")
-    except sqlglot.errors.ParseError as exc:
+        statements = _parse_cached(sql)
+        if not statements or statements[0] is None:
+            raise sqlglot.parse_error(f"No expression was parsed from '{sql}'")
+        parsed = statements[0]
+    except sqlglot.parse_error as exc:
         return ValidationResult(
             valid=False,
             error=f"SQL syntax error while applying dataset scope: {exc}",
@@ -236,7 +462,7 @@ def enforce_public_dataset_scope(sql: str) -> ValidationResult:
         )
 
     referenced_tables: set[str] = set()
-    for table_node in parsed.find_all(expressions.Table):
+    for table_node in parsed.find_all(sqlglot.exp.Table):
         table_name = table_node.name
         if table_name:
             referenced_tables.add(table_name.lower())
@@ -17,11 +17,13 @@ Rules:
     - Never log embedding vectors — only metadata (Hard Rule #9)
     - No DB access in this module — callers resolve DB data before calling
     - Raise errors immediately — retry logic lives in the Celery task
+    - Vectors are L2-normalized so search can rank by inner product
 """
 
 import time
 from typing import Optional
 
+import numpy as np
 import structlog
 
 from app.config import settings
@@ -29,6 +31,19 @@ from app.config import settings
 logger = structlog.get_logger(__name__)
 
 
+def _normalize(vectors: list[list[float]]) -> list[list[float]]:
+    """
+    Scale each vector to unit L2 norm.
+
+    pgvector's inner product on unit vectors equals cosine similarity, so
+    search can use the cheaper <#> operator. Zero vectors are returned as-is.
+    """
+    matrix = np.asarray(vectors, dtype=np.float64)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).tolist()
+
+
 def build_dataset_embedding_text(dataset) -> str:
     """
     Build the text string to embed for a dataset.
@@ -161,8 +176,8 @@ def embed_texts(texts: list[str], client) -> list[list[float]]:
         client: An openai.OpenAI client instance.
 
     Returns:
-        List of embedding vectors (each a list of floats), same length
-        and order as input texts.
+        List of unit-normalized embedding vectors (each a list of floats),
+        same length and order as input texts.
 
     Raises:
         openai.APIError and subclasses on API failure — caller handles retries.
@@ -185,7 +200,7 @@ def embed_texts(texts: list[str], client) -> list[list[float]]:
 
         # Extract embeddings in order (API returns them sorted by index)
         batch_embeddings = [item.embedding for item in response.data]
-        all_embeddings.extend(batch_embeddings)
+        all_embeddings.extend(_normalize(batch_embeddings))
 
         # Track token usage
         if response.usage:
@@ -216,7 +231,7 @@ def embed_single(text: str, client) -> list[float]:
         client: An openai.OpenAI client instance.
 
     Returns:
-        A single embedding vector (list of floats).
+        A single unit-normalized embedding vector (list of floats).
     """
     results = embed_texts([text], client)
     return results[0]
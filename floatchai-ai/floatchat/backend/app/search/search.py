@@ -2,27 +2,34 @@
 FloatChat Semantic Search Module
 
 Implements semantic similarity search over dataset and float embeddings
-using pgvector's cosine distance operator (<=>) with hybrid scoring.
+using pgvector's inner product operator (<#>) with hybrid scoring.
+Embeddings are L2-normalized by embeddings.py, so the inner product equals
+cosine similarity and 1 + (a <#> b) is the cosine distance.
 
 Functions:
     search_datasets  — Semantic search over dataset embeddings with filters
     search_floats    — Semantic search over float embeddings with filters
 
 Rules:
-    - Always use the <=> cosine distance operator (Hard Rule #6)
+    - Always rank by cosine similarity (Hard Rule #6) — via <#> on
+      unit-normalized vectors, matching the vector_ip_ops HNSW indexes
     - Never return results below SEARCH_SIMILARITY_THRESHOLD (Hard Rule #5)
     - Never log embedding vectors — only metadata (Hard Rule #9)
     - Fuzzy region matching goes through resolve_region_name (Hard Rule #7)
     - Empty list is a valid response when no results meet threshold
+    - Query vectors are cached in Redis as float32 bytes when a client is given
 """
 
+import hashlib
 import time
 from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 
+import numpy as np
 import structlog
 from geoalchemy2.functions import ST_Intersects
-from sqlalchemy import select
+from redis import Redis
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 
 from app.config import settings
@@ -33,10 +40,58 @@ from app.db.models import (
     FloatEmbedding,
     OceanRegion,
 )
+from app.monitoring.metrics import record_cache_hit, record_cache_miss
 from app.search.embeddings import embed_single
 
 logger = structlog.get_logger(__name__)
 
+# Redis key prefix for cached query embeddings.  "unit" marks vectors cached
+# after embed_texts began L2-normalizing; older entries are never read back.
+_EMBEDDING_CACHE_PREFIX = "query_embedding_unit"
+
+
+def _embedding_cache_key(query: str) -> str:
+    """Build a content-addressed cache key for a query under the current model."""
+    digest = hashlib.md5(query.encode("utf-8")).hexdigest()
+    return f"{_EMBEDDING_CACHE_PREFIX}:{settings.EMBEDDING_MODEL}:{digest}"
+
+
+def _embed_query(
+    query: str, openai_client, redis_client: Optional[Redis]
+) -> list[float]:
+    """
+    Embed a search query, reusing a vector cached in Redis when possible.
+
+    Vectors are stored as raw float32 bytes (the precision pgvector keeps)
+    with a QUERY_EMBEDDING_CACHE_TTL_SECONDS expiry. Redis failures fall
+    through to embed_single — the cache never breaks search.
+    """
+    if redis_client is None:
+        return embed_single(query, openai_client)
+
+    key = _embedding_cache_key(query)
+    try:
+        raw = redis_client.get(key)
+    except Exception:
+        logger.warning("redis_get_error", key=key, exc_info=True)
+        raw = None
+
+    if raw is not None:
+        record_cache_hit("query_embedding")
+        return np.frombuffer(raw, dtype=np.float32).tolist()
+
+    record_cache_miss("query_embedding")
+    vector = embed_single(query, openai_client)
+    try:
+        redis_client.set(
+            key,
+            np.asarray(vector, dtype=np.float32).tobytes(),
+            ex=settings.QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+        )
+    except Exception:
+        logger.warning("redis_set_error", key=key, exc_info=True)
+    return vector
+
 
 def _resolve_region_polygon(region_name: str, db: Session):
     """
@@ -66,6 +121,36 @@ def _resolve_region_polygon(region_name: str, db: Session):
     return region
 
 
+def _column(rows, name: str) -> np.ndarray:
+    """Gather one numeric column of the candidate rows into a float64 array."""
+    return np.fromiter(
+        (float(getattr(row, name)) for row in rows),
+        dtype=np.float64,
+        count=len(rows),
+    )
+
+
+def _rank(
+    scores: np.ndarray, candidates: np.ndarray, limit: int
+) -> tuple[list[int], list[float]]:
+    """
+    Cap scores at 1.0, drop non-candidates and rows below
+    SEARCH_SIMILARITY_THRESHOLD, and order the rest by score descending.
+
+    The threshold is checked on the exact score; sorting uses the score
+    rounded to 4 places with a stable sort, so ties keep their SQL order.
+
+    Returns the row indices of the top ``limit`` results and their scores.
+    """
+    scores = np.minimum(scores, 1.0)
+    kept = np.flatnonzero(
+        candidates & (scores >= settings.SEARCH_SIMILARITY_THRESHOLD)
+    )
+    rounded = np.round(scores[kept], 4)
+    ranking = np.argsort(-rounded, kind="stable")[:limit]
+    return kept[ranking].tolist(), rounded[ranking].tolist()
+
+
 def search_datasets(
     query: str,
     db: Session,
@@ -73,13 +158,15 @@ def search_datasets(
     filters: Optional[dict[str, Any]] = None,
     limit: Optional[int] = None,
     public_only: bool = False,
+    redis_client: Optional[Redis] = None,
 ) -> list[dict[str, Any]]:
     """
     Semantic similarity search over dataset embeddings with hybrid scoring.
 
     Steps:
-        1. Embed the query using embed_single
-        2. Query dataset_embeddings using <=> cosine distance for 3× limit candidates
+        1. Embed the query using embed_single (or the Redis cache)
+        2. Query dataset_embeddings by inner product (<#>) for 3× limit
+           candidates, skipping rows too distant to reach the threshold
         3. Join datasets table to apply structured filters
         4. Filter out status='embedding_failed'
         5. Apply recency boost (+0.05 for recent datasets)
@@ -95,6 +182,8 @@ def search_datasets(
                  date_to, region_name.
         limit: Max results to return. Defaults to SEARCH_DEFAULT_LIMIT,
                capped at SEARCH_MAX_LIMIT.
+        redis_client: Optional Redis client (decode_responses=False) used
+               to cache the query embedding.
 
     Returns:
         List of dicts with: dataset_id, name, summary_text, score,
@@ -115,11 +204,28 @@ def search_datasets(
         )
 
     # 1. Embed the query text
-    query_vector = embed_single(query, openai_client)
+    query_vector = _embed_query(query, openai_client, redis_client)
 
     # 2. Build the candidate query — retrieve 3× limit before filtering/boosting
     candidate_limit = limit * 3
-    cosine_distance = DatasetEmbedding.embedding.cosine_distance(query_vector)
+    # <#> yields the negative inner product; order by it directly so the
+    # HNSW index is used
+    neg_inner_product = DatasetEmbedding.embedding.max_inner_product(query_vector)
+    cosine_distance = neg_inner_product + 1.0
+
+    # Rows that cannot reach the threshold even with every boost applied are
+    # pruned in SQL; the exact post-boost check below still enforces it
+    max_boost = settings.RECENCY_BOOST_VALUE
+    if filters.get("region_name"):
+        max_boost += settings.REGION_MATCH_BOOST_VALUE
+    max_dist = min(1.0 - settings.SEARCH_SIMILARITY_THRESHOLD + max_boost, 1.0)
+
+    # The recency check runs in SQL; NULL ingestion dates come back as NULL
+    # and never earn the boost
+    recency_cutoff = datetime.now(timezone.utc) - timedelta(
+        days=settings.RECENCY_BOOST_DAYS
+    )
+    is_recent = Dataset.ingestion_date >= bindparam("recency_cutoff", recency_cutoff)
 
     stmt = (
         select(
@@ -131,7 +237,7 @@ def search_datasets(
             Dataset.date_range_end,
             Dataset.float_count,
             Dataset.variable_list,
-            Dataset.ingestion_date,
+            is_recent.label("is_recent"),
             Dataset.bbox,
             Dataset.is_active,
             cosine_distance.label("cosine_distance"),
@@ -140,7 +246,8 @@ def search_datasets(
         .where(DatasetEmbedding.status == "indexed")
         .where(Dataset.is_active == True)  # noqa: E712
         .where(Dataset.deleted_at.is_(None))
-        .order_by(cosine_distance.asc())
+        .where(cosine_distance <= bindparam("max_dist", max_dist))
+        .order_by(neg_inner_product.asc())
         .limit(candidate_limit)
     )
 
@@ -187,56 +294,51 @@ def search_datasets(
     rows = db.execute(stmt).all()
 
     # 4–8. Apply hybrid scoring and filtering
-    recency_cutoff = datetime.now(timezone.utc) - timedelta(
-        days=settings.RECENCY_BOOST_DAYS
-    )
-
     # Resolve region polygon if region filter provided (for region boost)
     region_obj = None
     if filters.get("region_name"):
         region_obj = _resolve_region_polygon(filters["region_name"], db)
 
-    results = []
-    for row in rows:
-        # Base score: 1 - cosine_distance (FR-16)
-        cosine_score = 1.0 - float(row.cosine_distance)
-
-        # Skip if base cosine similarity is extremely low (negative scores)
-        if cosine_score <= 0:
-            continue
-
-        score = cosine_score
-
-        # 5. Recency boost
-        if row.ingestion_date and row.ingestion_date >= recency_cutoff:
-            score += settings.RECENCY_BOOST_VALUE
+    # Base score: 1 - cosine_distance (FR-16), computed for all candidates
+    # at once; rows with a non-positive base similarity are never returned
+    cosine_scores = 1.0 - _column(rows, "cosine_distance")
+    candidates = cosine_scores > 0
+    scores = cosine_scores.copy()
 
-        # 6. Region match boost
-        if region_obj is not None and row.bbox is not None:
+    # 5. Recency boost
+    recent = np.fromiter(
+        (bool(row.is_recent) for row in rows), dtype=bool, count=len(rows)
+    )
+    scores += np.where(recent, settings.RECENCY_BOOST_VALUE, 0.0)
+
+    # 6. Region match boost — one spatial check per surviving candidate
+    if region_obj is not None:
+        for idx in np.flatnonzero(candidates):
+            bbox = rows[idx].bbox
+            if bbox is None:
+                continue
             try:
                 intersects = db.execute(
-                    select(
-                        ST_Intersects(row.bbox, region_obj.geom)
-                    )
+                    select(ST_Intersects(bbox, region_obj.geom))
                 ).scalar()
                 if intersects:
-                    score += settings.REGION_MATCH_BOOST_VALUE
+                    scores[idx] += settings.REGION_MATCH_BOOST_VALUE
             except Exception:
                 # If spatial check fails, skip the boost silently
                 pass
 
-        # Cap score at 1.0
-        score = min(score, 1.0)
-
-        # 7. Filter below threshold (Hard Rule #5)
-        if score < settings.SEARCH_SIMILARITY_THRESHOLD:
-            continue
+    # 7–8. Cap at 1.0, drop rows below threshold (Hard Rule #5), sort by
+    # final score descending and keep the top limit
+    order, ranked_scores = _rank(scores, candidates, limit)
 
+    results = []
+    for idx, score in zip(order, ranked_scores):
+        row = rows[idx]
         results.append({
             "dataset_id": row.dataset_id,
             "name": row.name,
             "summary_text": row.summary_text,
-            "score": round(score, 4),
+            "score": score,
             "date_range_start": (
                 row.date_range_start.isoformat() if row.date_range_start else None
             ),
@@ -247,10 +349,6 @@ def search_datasets(
             "variable_list": row.variable_list,
         })
 
-    # 8. Sort by final score descending, return top limit
-    results.sort(key=lambda r: r["score"], reverse=True)
-    results = results[:limit]
-
     elapsed = round(time.time() - start_time, 3)
     logger.info(
         "search_datasets",
@@ -270,6 +368,7 @@ def search_floats(
     openai_client,
     filters: Optional[dict[str, Any]] = None,
     limit: Optional[int] = None,
+    redis_client: Optional[Redis] = None,
 ) -> list[dict[str, Any]]:
     """
     Semantic similarity search over float embeddings with hybrid scoring.
@@ -284,6 +383,8 @@ def search_floats(
         filters: Optional dict with keys: float_type, region_name.
         limit: Max results to return. Defaults to SEARCH_DEFAULT_LIMIT,
                capped at SEARCH_MAX_LIMIT.
+        redis_client: Optional Redis client (decode_responses=False) used
+               to cache the query embedding.
 
     Returns:
         List of dicts with: float_id, platform_number, float_type, score,
@@ -304,11 +405,17 @@ def search_floats(
         )
 
     # 1. Embed the query text
-    query_vector = embed_single(query, openai_client)
+    query_vector = _embed_query(query, openai_client, redis_client)
 
     # 2. Build the candidate query — retrieve 3× limit
     candidate_limit = limit * 3
-    cosine_distance = FloatEmbedding.embedding.cosine_distance(query_vector)
+    # <#> yields the negative inner product; order by it directly so the
+    # HNSW index is used
+    neg_inner_product = FloatEmbedding.embedding.max_inner_product(query_vector)
+    cosine_distance = neg_inner_product + 1.0
+
+    # No boosts for floats, so the threshold maps directly to a distance bound
+    max_dist = 1.0 - settings.SEARCH_SIMILARITY_THRESHOLD
 
     stmt = (
         select(
@@ -323,7 +430,8 @@ def search_floats(
         )
         .join(Float, FloatEmbedding.float_id == Float.float_id)
         .where(FloatEmbedding.status == "indexed")
-        .order_by(cosine_distance.asc())
+        .where(cosine_distance <= bindparam("max_dist", max_dist))
+        .order_by(neg_inner_product.asc())
         .limit(candidate_limit)
     )
 
@@ -354,36 +462,22 @@ def search_floats(
     rows = db.execute(stmt).all()
 
     # 4–8. Apply scoring and filtering
-    results = []
-    for row in rows:
-        # Base score: 1 - cosine_distance
-        cosine_score = 1.0 - float(row.cosine_distance)
-
-        if cosine_score <= 0:
-            continue
-
-        score = cosine_score
-
-        # Cap score at 1.0
-        score = min(score, 1.0)
-
-        # Filter below threshold (Hard Rule #5)
-        if score < settings.SEARCH_SIMILARITY_THRESHOLD:
-            continue
+    # Base score: 1 - cosine_distance; no boosts apply to floats
+    scores = 1.0 - _column(rows, "cosine_distance")
+    order, ranked_scores = _rank(scores, scores > 0, limit)
 
+    results = []
+    for idx, score in zip(order, ranked_scores):
+        row = rows[idx]
         results.append({
             "float_id": row.float_id,
             "platform_number": row.platform_number,
             "float_type": row.float_type,
-            "score": round(score, 4),
+            "score": score,
             "deployment_lat": row.deployment_lat,
             "deployment_lon": row.deployment_lon,
         })
 
-    # Sort by score descending, return top limit
-    results.sort(key=lambda r: r["score"], reverse=True)
-    results = results[:limit]
-
     elapsed = round(time.time() - start_time, 3)
     logger.info(
         "search_floats",
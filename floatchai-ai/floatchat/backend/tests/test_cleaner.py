@@ -13,6 +13,7 @@ import pytest
 
 from app.ingestion.cleaner import (
     CleanedMeasurement,
+    CleanedMeasurementArray,
     CleaningResult,
     CleaningStats,
     clean_measurement,
@@ -20,7 +21,13 @@ from app.ingestion.cleaner import (
     clean_parse_result,
     validate_against_bounds,
 )
-from app.ingestion.parser import MeasurementRecord, ParseResult, FloatInfo, ProfileInfo
+from app.ingestion.parser import (
+    FloatInfo,
+    MeasurementArray,
+    MeasurementRecord,
+    ParseResult,
+    ProfileInfo,
+)
 
 
 # =========================================================================
@@ -179,6 +186,20 @@ class TestCleanMeasurements:
         result = clean_measurements(records)
         assert len(result.measurements) == 2
 
+    def test_batch_flags_match_single_record_cleaning(self):
+        """Vectorized batch flags should match clean_measurement per record."""
+        records = [
+            MeasurementRecord(pressure=10.0, temperature=None, salinity=35.0),
+            MeasurementRecord(pressure=-1.0, temperature=40.0, salinity=None, oxygen=700.0),
+            MeasurementRecord(pressure=20.0, temperature=-2.5, ph=9.0, nitrate=55.0),
+        ]
+        result = clean_measurements(records)
+        assert list(result.measurements) == [clean_measurement(r) for r in records]
+        assert result.measurements[1] == clean_measurement(records[1])
+        assert result.stats.flagged_records == 2
+        assert result.stats.flags_by_variable["pressure"] == 1
+        assert result.stats.flags_by_variable["temperature"] == 0
+
 
 # =========================================================================
 # clean_parse_result tests
@@ -217,6 +238,33 @@ class TestCleanParseResult:
         assert len(result.measurements) == 2
 
 
+# =========================================================================
+# CleanedMeasurementArray tests
+# =========================================================================
+class TestCleanedMeasurementArray:
+    """Tests for building the column-wise array directly."""
+
+    def _values(self) -> MeasurementArray:
+        return MeasurementArray.from_records([
+            MeasurementRecord(pressure=10.0, temperature=20.0),
+            MeasurementRecord(pressure=50.0, temperature=15.0),
+        ])
+
+    def test_missing_flags_are_unflagged(self):
+        """Flag masks that were not supplied read as all False."""
+        array = CleanedMeasurementArray(values=self._values())
+        records = array.records()
+        assert [r.pressure for r in records] == [10.0, 50.0]
+        assert not any(r.has_outlier for r in records)
+        assert not array[1].temperature_flag
+        assert not array.is_outlier.any()
+
+    def test_mismatched_flag_length_rejected(self):
+        """A flag mask must have one entry per level."""
+        with pytest.raises(ValueError, match="temperature"):
+            CleanedMeasurementArray(values=self._values(), flags={"temperature": [True]})
+
+
 # =========================================================================
 # validate_against_bounds tests
 # =========================================================================
@@ -272,6 +272,23 @@ class TestEmbedTextsReturnShape:
         assert result == []
         mock_client.embeddings.create.assert_not_called()
 
+    @patch("app.search.embeddings.settings")
+    def test_vectors_are_unit_normalized(self, mock_settings):
+        from app.search.embeddings import embed_texts
+
+        mock_settings.EMBEDDING_BATCH_SIZE = 100
+        mock_settings.EMBEDDING_MODEL = "text-embedding-3-small"
+
+        vectors = [[3.0, 4.0], [0.0, 0.0]]
+        mock_client = MagicMock()
+        mock_client.embeddings.create.return_value = _mock_embedding_response(vectors)
+
+        result = embed_texts(["a", "b"], mock_client)
+
+        assert result[0] == pytest.approx([0.6, 0.8])
+        # Zero vectors are left alone rather than divided by zero
+        assert result[1] == [0.0, 0.0]
+
 
 # ── Test 5: index_dataset sets embedding_failed on API error ─────────────────
 
@@ -1,14 +1,16 @@
 """
 Tests for app.query.executor — SQL execution on readonly session.
 
-Uses mocked SQLAlchemy sessions — no live database required.
+Uses fake SQLAlchemy sessions — no live database required.
 """
 
-from unittest.mock import MagicMock, patch
+from dataclasses import dataclass, field
+from typing import Any, Optional
 import json
 
 import pytest
 
+import app.query.executor as executor_module
 from app.query.executor import (
     ExecutionResult,
     execute_sql,
@@ -18,6 +20,43 @@ from app.query.executor import (
 )
 
 
+# ═════════════════════════════════════════════════════════════════════════════
+# Readonly session fakes
+# ═════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class _FakeResult:
+    """Precomputed result exposing the Result methods the executor uses."""
+    rows: list[tuple] = field(default_factory=list)
+    columns: list[str] = field(default_factory=list)
+
+    def keys(self) -> list[str]:
+        return self.columns
+
+    def fetchall(self) -> list[tuple]:
+        return self.rows
+
+    def fetchmany(self, n: int) -> list[tuple]:
+        return self.rows[:n]
+
+    def fetchone(self) -> Optional[tuple]:
+        return self.rows[0] if self.rows else None
+
+
+@dataclass
+class _FakeDB:
+    """Session stand-in that records executed SQL, then returns ``result`` or raises ``error``."""
+    result: Optional[_FakeResult] = None
+    error: Optional[Exception] = None
+    executed: list[Any] = field(default_factory=list)
+
+    def execute(self, statement: Any) -> Optional[_FakeResult]:
+        self.executed.append(statement)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
 # ═════════════════════════════════════════════════════════════════════════════
 # _has_limit helper
 # ═════════════════════════════════════════════════════════════════════════════
@@ -47,6 +86,12 @@ class TestHasLimit:
         sql = "SELECT * FROM floats f JOIN profiles p ON p.float_id = f.float_id LIMIT 1000"
         assert _has_limit(sql) is True
 
+    def test_lowercase_limit(self):
+        assert _has_limit("select * from floats limit 10") is True
+
+    def test_limit_inside_identifier_ignored(self):
+        assert _has_limit("SELECT depth_limit FROM floats") is False
+
 
 # ═════════════════════════════════════════════════════════════════════════════
 # _apply_limit helper
@@ -77,16 +122,12 @@ class TestApplyLimit:
 # ═════════════════════════════════════════════════════════════════════════════
 
 class TestExecuteSql:
-    def _mock_db(self, rows, columns):
-        """Create a mock DB session that returns the given rows/columns."""
-        mock_result = MagicMock()
-        mock_result.keys.return_value = columns
-        mock_result.fetchall.return_value = [
-            tuple(row[c] for c in columns) for row in rows
-        ]
-        db = MagicMock()
-        db.execute.return_value = mock_result
-        return db
+    def _fake_db(self, rows, columns):
+        """Create a fake DB session that returns the given rows/columns."""
+        return _FakeDB(result=_FakeResult(
+            rows=[tuple(row[c] for c in columns) for row in rows],
+            columns=columns,
+        ))
 
     def test_successful_execution(self):
         rows = [
@@ -94,7 +135,7 @@ class TestExecuteSql:
             {"platform_number": "F002", "float_type": "BGC"},
         ]
         columns = ["platform_number", "float_type"]
-        db = self._mock_db(rows, columns)
+        db = self._fake_db(rows, columns)
 
         result = execute_sql("SELECT * FROM floats", db, max_rows=100)
 
@@ -105,11 +146,25 @@ class TestExecuteSql:
         assert result.rows[0]["platform_number"] == "F001"
         assert result.truncated is False
 
+    def test_data_is_column_major(self):
+        rows = [
+            {"platform_number": "F001", "float_type": "core"},
+            {"platform_number": "F002", "float_type": "BGC"},
+        ]
+        columns = ["platform_number", "float_type"]
+        db = self._fake_db(rows, columns)
+
+        result = execute_sql("SELECT * FROM floats", db, max_rows=100)
+
+        assert result.data == [["F001", "F002"], ["core", "BGC"]]
+        assert result.rows == rows
+        assert result.rows is result.rows  # materialized once
+
     def test_truncated_results(self):
         # Simulate max_rows = 2, with 2 rows returned (implies truncation)
         rows = [{"id": 1}, {"id": 2}]
         columns = ["id"]
-        db = self._mock_db(rows, columns)
+        db = self._fake_db(rows, columns)
 
         result = execute_sql("SELECT id FROM floats", db, max_rows=2)
 
@@ -117,15 +172,15 @@ class TestExecuteSql:
         assert result.truncated is True
 
     def test_empty_result(self):
-        db = self._mock_db([], ["id"])
+        db = self._fake_db([], ["id"])
         result = execute_sql("SELECT * FROM floats WHERE 1=0", db)
         assert result.row_count == 0
         assert result.rows == []
+        assert result.data == [[]]
         assert result.truncated is False
 
     def test_execution_error(self):
-        db = MagicMock()
-        db.execute.side_effect = Exception("connection refused")
+        db = _FakeDB(error=Exception("connection refused"))
 
         result = execute_sql("SELECT * FROM floats", db)
 
@@ -136,13 +191,12 @@ class TestExecuteSql:
     def test_limit_already_present(self):
         rows = [{"id": 1}]
         columns = ["id"]
-        db = self._mock_db(rows, columns)
+        db = self._fake_db(rows, columns)
 
         execute_sql("SELECT * FROM floats LIMIT 5", db, max_rows=1000)
 
         # Check that the executed SQL was NOT wrapped
-        call_args = db.execute.call_args
-        executed_sql = str(call_args[0][0])
+        executed_sql = str(db.executed[-1])
         assert "AS _q" not in executed_sql
 
 
@@ -151,53 +205,77 @@ class TestExecuteSql:
 # ═════════════════════════════════════════════════════════════════════════════
 
 class TestEstimateRows:
+    @pytest.fixture(autouse=True)
+    def _clear_estimate_cache(self):
+        estimate_rows.cache_clear()
+        yield
+        estimate_rows.cache_clear()
+
     def test_successful_estimation(self):
         plan_json = [{"Plan": {"Plan Rows": 42000, "Node Type": "Seq Scan"}}]
-
-        mock_result = MagicMock()
-        mock_result.fetchone.return_value = (plan_json,)
-        db = MagicMock()
-        db.execute.return_value = mock_result
+        db = _FakeDB(result=_FakeResult(rows=[(plan_json,)]))
 
         result = estimate_rows("SELECT * FROM floats", db)
         assert result == 42000
 
     def test_estimation_from_json_string(self):
         plan_json = json.dumps([{"Plan": {"Plan Rows": 500}}])
-
-        mock_result = MagicMock()
-        mock_result.fetchone.return_value = (plan_json,)
-        db = MagicMock()
-        db.execute.return_value = mock_result
+        db = _FakeDB(result=_FakeResult(rows=[(plan_json,)]))
 
         result = estimate_rows("SELECT * FROM floats", db)
         assert result == 500
 
+    def test_estimation_from_json_bytes(self):
+        plan_json = json.dumps([{"Plan": {"Plan Rows": 7}}]).encode()
+        db = _FakeDB(result=_FakeResult(rows=[(plan_json,)]))
+
+        result = estimate_rows("SELECT * FROM floats", db)
+        assert result == 7
+
     def test_estimation_returns_none_on_error(self):
-        db = MagicMock()
-        db.execute.side_effect = Exception("explain failed")
+        db = _FakeDB(error=Exception("explain failed"))
 
         result = estimate_rows("SELECT * FROM floats", db)
         assert result is None
 
     def test_estimation_returns_none_on_empty_result(self):
-        mock_result = MagicMock()
-        mock_result.fetchone.return_value = None
-        db = MagicMock()
-        db.execute.return_value = mock_result
+        db = _FakeDB(result=_FakeResult(rows=[]))
 
         result = estimate_rows("SELECT * FROM floats", db)
         assert result is None
 
     def test_estimation_returns_none_on_bad_json(self):
-        mock_result = MagicMock()
-        mock_result.fetchone.return_value = ("not json at all",)
-        db = MagicMock()
-        db.execute.return_value = mock_result
+        db = _FakeDB(result=_FakeResult(rows=[("not json at all",)]))
 
         result = estimate_rows("SELECT * FROM floats", db)
         assert result is None
 
+    def test_repeated_estimation_is_cached(self):
+        plan_json = [{"Plan": {"Plan Rows": 42000}}]
+        db = _FakeDB(result=_FakeResult(rows=[(plan_json,)]))
+
+        assert estimate_rows("SELECT *  FROM floats", db) == 42000
+        assert estimate_rows("SELECT * FROM\n  floats", db) == 42000
+        assert len(db.executed) == 1
+
+    def test_cached_estimate_expires(self, monkeypatch):
+        plan_json = [{"Plan": {"Plan Rows": 42000}}]
+        db = _FakeDB(result=_FakeResult(rows=[(plan_json,)]))
+        now = [1000.0]
+        monkeypatch.setattr(executor_module.time, "monotonic", lambda: now[0])
+
+        assert estimate_rows("SELECT * FROM floats", db) == 42000
+        now[0] += executor_module._ESTIMATE_CACHE_TTL_SECONDS + 1
+        assert estimate_rows("SELECT * FROM floats", db) == 42000
+        assert len(db.executed) == 2
+
+    def test_failed_estimation_not_cached(self):
+        db = _FakeDB(error=Exception("explain failed"))
+
+        assert estimate_rows("SELECT * FROM floats", db) is None
+        assert estimate_rows("SELECT * FROM floats", db) is None
+        assert len(db.executed) == 2
+
 
 # ═════════════════════════════════════════════════════════════════════════════
 # ExecutionResult dataclass
@@ -216,3 +294,7 @@ class TestExecutionResult:
         r = ExecutionResult(error="boom")
         assert r.error == "boom"
         assert r.row_count == 0
+
+    def test_slotted(self):
+        r = ExecutionResult()
+        assert not hasattr(r, "__dict__")
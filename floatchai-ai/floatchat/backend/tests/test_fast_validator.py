@@ -0,0 +1,74 @@
+"""
+Tests for app.query.fast_validator — plain-SELECT scanner.
+
+Every statement the scanner recognizes must read exactly the tables it
+reports; everything else must come back as None so the validator falls
+back to sqlglot.
+"""
+
+import pytest
+
+from app.query.fast_validator import simple_select_tables
+
+
+class TestRecognized:
+    @pytest.mark.parametrize(
+        "sql,tables",
+        [
+            pytest.param("SELECT * FROM floats LIMIT 10", {"floats"}, id="star"),
+            pytest.param(
+                "select distinct f.country from Floats f order by f.country nulls last limit 5 offset 2;",
+                {"floats"},
+                id="lowercase_distinct_nulls_last",
+            ),
+            pytest.param(
+                "SELECT p.platform_number, AVG(m.temperature) AS avg_temp "
+                "FROM profiles p JOIN measurements m ON m.profile_id = p.profile_id "
+                "WHERE m.temp_qc = 1 AND p.latitude BETWEEN 10 AND 20 "
+                "GROUP BY p.platform_number HAVING COUNT(*) > 5 ORDER BY avg_temp DESC",
+                {"profiles", "measurements"},
+                id="join_aggregate",
+            ),
+            pytest.param(
+                "SELECT CASE WHEN f.float_type = 'BGC' THEN 1 ELSE 0 END AS is_bgc "
+                "FROM floats f LEFT OUTER JOIN profiles p ON p.float_id = f.float_id "
+                "WHERE p.data_mode NOT IN ('R', 'A') OR p.geom IS NULL",
+                {"floats", "profiles"},
+                id="case_left_join",
+            ),
+            pytest.param(
+                "SELECT * FROM floats f, secret_table s", {"floats", "secret_table"}, id="comma_join"
+            ),
+        ],
+    )
+    def test_tables_reported(self, sql, tables):
+        assert simple_select_tables(sql) == frozenset(tables)
+
+
+class TestFallsBack:
+    @pytest.mark.parametrize(
+        "sql",
+        [
+            pytest.param("SELECT * FROM floats f -- JOIN secret_table s ON true", id="line_comment"),
+            pytest.param("SELECT * FROM floats /* x */", id="block_comment"),
+            pytest.param('SELECT * FROM "floats"', id="quoted_identifier"),
+            pytest.param("SELECT * FROM pg_catalog.pg_authid", id="schema_qualified"),
+            pytest.param("SELECT * FROM floats WHERE float_id IN (SELECT 1 FROM secret)", id="subquery"),
+            pytest.param("WITH t AS (SELECT * FROM floats) SELECT * FROM t", id="cte"),
+            pytest.param("SELECT 1 FROM floats UNION SELECT 2 FROM secret", id="union"),
+            pytest.param("SELECT 1 FROM floats; DROP TABLE floats", id="multi_statement"),
+            pytest.param("SELECT pg_read_file('/etc/passwd') FROM floats", id="unsafe_function"),
+            pytest.param("SELECT * FROM floats WHERE country = E'\\\\'", id="escape_string"),
+            pytest.param("SELECT * FROM floats WHERE deployment_date > date '2024-01-01'", id="typed_literal"),
+            pytest.param("SELECT * FROM ONLY floats", id="only"),
+            pytest.param("SELECT * FROM floats FOR UPDATE", id="locking_clause"),
+            pytest.param("SELECT *\u00a0FROM floats", id="nbsp_space"),
+            pytest.param("SELECT * FROM floats\u3000", id="trailing_ideographic_space"),
+            pytest.param("SELECT * FROM floats LIMIT \u0661\u0660", id="arabic_indic_digits"),
+            pytest.param("SELECT *\vFROM floats", id="vertical_tab"),
+            pytest.param("DELETE FROM floats", id="write"),
+            pytest.param("", id="empty"),
+        ],
+    )
+    def test_returns_none(self, sql):
+        assert simple_select_tables(sql) is None
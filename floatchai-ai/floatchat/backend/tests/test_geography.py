@@ -73,6 +73,10 @@ class TestResolveGeography:
         result = resolve_geography("")
         assert result is None
 
+    def test_query_shorter_than_any_region_returns_none(self):
+        result = resolve_geography("hi")
+        assert result is None
+
     def test_specific_region_preferred_over_substring(self):
         """'south china sea' should match before 'china' substrings."""
         result = resolve_geography("Show data from the South China Sea")
@@ -102,6 +106,12 @@ class TestResolveGeography:
         # Either is acceptable
         assert result["name"] in ("north sea", "baltic sea")
 
+    def test_longest_match_wins_when_names_overlap(self):
+        """Overlapping names ('red sea' / 'sea of japan') still pick the longest."""
+        result = resolve_geography("between the red sea of japan and beyond")
+        assert result is not None
+        assert result["name"] == "sea of japan"
+
 
 # ═════════════════════════════════════════════════════════════════════════════
 # reload_geography
@@ -115,3 +125,22 @@ class TestReloadGeography:
     def test_reload_nonexistent_path(self):
         count = reload_geography("/nonexistent/path.json")
         assert count == 0
+
+    def test_reload_rebuilds_match_table(self, tmp_path):
+        custom = tmp_path / "geo.json"
+        custom.write_text(
+            '{"Test Basin": {"lat_min": 1.0, "lat_max": 2.0, "lon_min": 3.0, "lon_max": 4.0}}'
+        )
+        try:
+            assert reload_geography(str(custom)) == 1
+            result = resolve_geography("floats in the test basin")
+            assert result == {
+                "name": "test basin",
+                "lat_min": 1.0,
+                "lat_max": 2.0,
+                "lon_min": 3.0,
+                "lon_max": 4.0,
+            }
+            assert resolve_geography("profiles in the Arabian Sea") is None
+        finally:
+            reload_geography()
@@ -11,13 +11,24 @@ Tests:
 - Timestamps computed correctly from JULD
 """
 
+import hashlib
 import os
 from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
 
+import numpy as np
 import pytest
+import xarray as xr
 
+import app.ingestion.parser as parser_module
 from app.ingestion.parser import (
+    MeasurementArray,
+    MeasurementRecord,
     ParseResult,
+    _extract_measurements,
+    _profile_measurements,
+    _read_measurement_arrays,
     parse_netcdf_all_profiles,
     parse_netcdf_file,
     validate_file,
@@ -30,6 +41,18 @@ BGC_FILE = str(FIXTURES_DIR / "bgc_multi_profile.nc")
 MALFORMED_FILE = str(FIXTURES_DIR / "malformed_missing_psal.nc")
 
 
+@pytest.fixture(scope="session")
+def bgc_results() -> list[ParseResult]:
+    """All profiles of the BGC fixture, parsed once per session. Read-only."""
+    return parse_netcdf_all_profiles(BGC_FILE)
+
+
+@pytest.fixture(scope="session")
+def core_results() -> list[ParseResult]:
+    """All profiles of the core fixture, parsed once per session. Read-only."""
+    return parse_netcdf_all_profiles(CORE_FILE)
+
+
 # =========================================================================
 # validate_file tests
 # =========================================================================
@@ -149,12 +172,114 @@ class TestParseNetcdfFile:
         assert result.file_hash is not None
         assert len(result.file_hash) == 64  # SHA-256 hex digest
 
+    def test_file_hash_matches_sha256_of_bytes(self):
+        """File hash should be the SHA-256 of the raw file bytes."""
+        result = parse_netcdf_file(CORE_FILE)
+        expected = hashlib.sha256(Path(CORE_FILE).read_bytes()).hexdigest()
+        assert result.file_hash == expected
+
+    def test_large_file_path_matches_in_memory_read(self):
+        """Files over the in-memory limit should parse identically from disk."""
+        parse_netcdf_file.cache_clear()
+        in_memory = parse_netcdf_file(CORE_FILE)
+        parse_netcdf_file.cache_clear()
+        with patch.object(parser_module, "_IN_MEMORY_MAX_BYTES", 0):
+            from_disk = parse_netcdf_file(CORE_FILE)
+        parse_netcdf_file.cache_clear()
+        assert from_disk == in_memory
+
     def test_nonexistent_file_returns_error(self):
         """Parsing a nonexistent file should return error, not raise."""
         result = parse_netcdf_file("/nonexistent/file.nc")
         assert result.success is False
         assert result.error_message is not None
 
+    def test_repeat_parse_served_from_cache(self):
+        """Re-parsing an unchanged file should not reopen the dataset."""
+        parse_netcdf_file.cache_clear()
+        first = parse_netcdf_file(CORE_FILE)
+        with patch.object(parser_module.xr, "open_dataset") as mock_open:
+            second = parse_netcdf_file(CORE_FILE)
+        mock_open.assert_not_called()
+        assert second == first
+        parse_netcdf_file.cache_clear()
+
+    def test_cached_result_not_shared_with_callers(self):
+        """Mutating a returned result should not affect later parses."""
+        parse_netcdf_file.cache_clear()
+        first = parse_netcdf_file(CORE_FILE)
+        first.measurements.temperature[:] = -1.0
+        second = parse_netcdf_file(CORE_FILE)
+        assert not (second.measurements.temperature == -1.0).any()
+        parse_netcdf_file.cache_clear()
+
+
+# =========================================================================
+# _extract_measurements fill-value handling
+# =========================================================================
+class TestExtractMeasurements:
+    """Tests for vectorized fill-value masking in _extract_measurements."""
+
+    def test_fill_values_become_none(self):
+        """99999.0 / NaN become None; levels without PRES or T/S are dropped."""
+        ds = xr.Dataset({
+            "PRES": (("N_PROF", "N_LEVELS"), [[10.0, 20.0, 99999.0, 30.0]]),
+            "TEMP": (("N_PROF", "N_LEVELS"), [[1.5, 99999.0, 2.0, np.nan]]),
+            "PSAL": (("N_PROF", "N_LEVELS"), [[35.0, 35.1, 35.2, 99999.0]]),
+            "DOXY": (("N_PROF", "N_LEVELS"), [[200.0, np.nan, 210.0, 220.0]]),
+        })
+
+        records = _extract_measurements(ds, profile_idx=0).records()
+
+        assert records == [
+            MeasurementRecord(pressure=10.0, temperature=1.5, salinity=35.0, oxygen=200.0),
+            MeasurementRecord(pressure=20.0, temperature=None, salinity=35.1, oxygen=None),
+        ]
+
+    def test_profiles_sliced_from_one_read(self):
+        """Each profile's records should come from its own row of the arrays."""
+        ds = xr.Dataset({
+            "PRES": (("N_PROF", "N_LEVELS"), [[5.0, 99999.0], [6.0, 7.0]]),
+            "TEMP": (("N_PROF", "N_LEVELS"), [[1.0, 2.0], [3.0, 99999.0]]),
+            "PSAL": (("N_PROF", "N_LEVELS"), [[34.0, 34.1], [34.2, 34.3]]),
+        })
+
+        arrays = _read_measurement_arrays(ds)
+
+        assert _profile_measurements(arrays, 0).records() == [
+            MeasurementRecord(pressure=5.0, temperature=1.0, salinity=34.0),
+        ]
+        assert _profile_measurements(arrays, 1).records() == [
+            MeasurementRecord(pressure=6.0, temperature=3.0, salinity=34.2),
+            MeasurementRecord(pressure=7.0, temperature=None, salinity=34.3),
+        ]
+
+    def test_measurement_array_round_trips_records(self):
+        """from_records, iteration and indexing should agree, with None as NaN."""
+        records = [
+            MeasurementRecord(pressure=1.0, temperature=10.0, salinity=35.0),
+            MeasurementRecord(pressure=2.0, temperature=None, salinity=35.1, ph=8.0),
+        ]
+
+        array = MeasurementArray.from_records(records)
+
+        assert len(array) == 2
+        assert list(array) == records
+        assert array[1] == records[1]
+        assert np.isnan(array.temperature[1])
+        assert array == MeasurementArray.from_records(records)
+
+    def test_parse_result_converts_record_lists(self):
+        """ParseResult should store a list of records column-wise."""
+        result = ParseResult(success=True, measurements=[MeasurementRecord(pressure=5.0)])
+
+        assert isinstance(result.measurements, MeasurementArray)
+        assert result.extracted_rows_count == 1
+
+    def test_records_are_slotted(self):
+        """MeasurementRecord should not carry a per-instance __dict__."""
+        assert not hasattr(MeasurementRecord(pressure=1.0), "__dict__")
+
 
 # =========================================================================
 # parse_netcdf_all_profiles tests (multi-profile)
@@ -162,42 +287,74 @@ class TestParseNetcdfFile:
 class TestParseAllProfiles:
     """Tests for parse_netcdf_all_profiles with multi-profile files."""
 
-    def test_multi_profile_extracts_all(self):
+    def test_multi_profile_extracts_all(self, bgc_results):
         """BGC file with 3 profiles should return 3 ParseResults."""
-        results = parse_netcdf_all_profiles(BGC_FILE)
+        results = bgc_results
         assert len(results) == 3
         for r in results:
             assert r.success is True
 
-    def test_multi_profile_different_cycles(self):
+    def test_multi_profile_different_cycles(self, bgc_results):
         """Each profile should have a different cycle number."""
-        results = parse_netcdf_all_profiles(BGC_FILE)
+        results = bgc_results
         cycles = [r.profile_info.cycle_number for r in results]
         assert cycles == [10, 11, 12]
 
-    def test_multi_profile_has_bgc_variables(self):
+    def test_multi_profile_has_bgc_variables(self, bgc_results):
         """BGC file should have oxygen and chlorophyll_a values."""
-        results = parse_netcdf_all_profiles(BGC_FILE)
+        results = bgc_results
         for r in results:
-            has_oxygen = any(m.oxygen is not None for m in r.measurements)
-            has_chla = any(m.chlorophyll_a is not None for m in r.measurements)
+            has_oxygen = not np.isnan(r.measurements.oxygen).all()
+            has_chla = not np.isnan(r.measurements.chlorophyll_a).all()
             assert has_oxygen, f"Profile cycle {r.profile_info.cycle_number} missing oxygen"
             assert has_chla, f"Profile cycle {r.profile_info.cycle_number} missing chlorophyll_a"
 
-    def test_multi_profile_bgc_float_type(self):
+    def test_multi_profile_bgc_float_type(self, bgc_results):
         """BGC file should be identified as 'bgc' float type."""
-        results = parse_netcdf_all_profiles(BGC_FILE)
+        results = bgc_results
         assert results[0].float_info.float_type == "bgc"
 
-    def test_single_profile_file_returns_one(self):
+    def test_single_profile_file_returns_one(self, core_results):
         """Core file with 1 profile should return 1 ParseResult."""
-        results = parse_netcdf_all_profiles(CORE_FILE)
+        results = core_results
         assert len(results) == 1
         assert results[0].success is True
 
-    def test_multi_profile_has_outlier_value(self):
+    def test_multi_profile_has_outlier_value(self, bgc_results):
         """Profile 3 (cycle 12) should have a 45.0°C temperature measurement."""
-        results = parse_netcdf_all_profiles(BGC_FILE)
+        results = bgc_results
         profile_3 = results[2]  # index 2 = cycle 12
-        temps = [m.temperature for m in profile_3.measurements if m.temperature is not None]
-        assert 45.0 in [round(t, 1) for t in temps], "Expected 45.0°C outlier in profile 3"
+        temps = profile_3.measurements.temperature
+        assert np.isclose(temps, 45.0, rtol=0.0, atol=0.05).any(), "Expected 45.0°C outlier in profile 3"
+
+    def test_process_pool_matches_serial_parse(self, bgc_results):
+        """Parsing profiles across a process pool should equal the serial parse."""
+        pool_outputs = []
+        real_parallel = parser_module._parse_profiles_parallel
+
+        def spy(*args, **kwargs):
+            profiles = real_parallel(*args, **kwargs)
+            pool_outputs.append(profiles)
+            return profiles
+
+        with patch.object(parser_module.settings, "PARSE_PARALLEL_MIN_PROFILES", 2), \
+                patch.object(parser_module.settings, "PARSE_MAX_WORKERS", 2), \
+                patch.object(parser_module, "_parse_profiles_parallel", spy):
+            parallel = parse_netcdf_all_profiles(BGC_FILE)
+
+        # The pool really ran rather than silently falling back to serial
+        assert len(pool_outputs) == 1 and pool_outputs[0] is not None
+        assert parallel == bgc_results
+
+    def test_process_pool_off_by_default(self):
+        """Without an explicit PARSE_MAX_WORKERS, files are parsed serially."""
+        with patch.object(parser_module.settings, "PARSE_PARALLEL_MIN_PROFILES", 2), \
+                patch.object(parser_module.settings, "PARSE_MAX_WORKERS", 0):
+            assert parser_module._should_parse_in_parallel(100) is False
+
+    def test_process_pool_skipped_in_celery_worker(self):
+        """Celery prefork children (daemonic billiard processes) parse serially."""
+        with patch.object(parser_module.settings, "PARSE_PARALLEL_MIN_PROFILES", 2), \
+                patch.object(parser_module.settings, "PARSE_MAX_WORKERS", 4), \
+                patch("billiard.process.current_process", return_value=SimpleNamespace(daemon=True)):
+            assert parser_module._should_parse_in_parallel(100) is False
@@ -5,7 +5,11 @@ All LLM calls are mocked — no real API keys required.
 """
 
 import json
-from dataclasses import dataclass
+import re
+import threading
+from dataclasses import dataclass, replace
+from types import SimpleNamespace
+from typing import Optional
 from unittest.mock import MagicMock, patch, AsyncMock
 
 import pytest
@@ -18,6 +22,8 @@ from app.query.pipeline import (
     _extract_sql,
     _build_messages,
     _get_model,
+    _build_client,
+    _resolve_model,
     _PROVIDER_CONFIG,
 )
 
@@ -26,44 +32,52 @@ from app.query.pipeline import (
 # Mock settings
 # ═════════════════════════════════════════════════════════════════════════════
 
+@dataclass(frozen=True)
 class MockSettings:
-    QUERY_LLM_PROVIDER = "deepseek"
-    QUERY_LLM_MODEL = "deepseek-reasoner"
-    QUERY_LLM_TEMPERATURE = 0.0
-    QUERY_LLM_MAX_TOKENS = 2048
-    QUERY_MAX_RETRIES = 3
-    DEEPSEEK_API_KEY = "sk-test-deepseek"
-    DEEPSEEK_BASE_URL = "https://api.deepseek.com/v1"
-    QWEN_API_KEY = "sk-test-qwen"
-    QWEN_BASE_URL = "https://dashscope.aliyuncs.com/compatible-mode/v1"
-    GEMMA_API_KEY = "sk-test-gemma"
-    GEMMA_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai"
-    OPENAI_API_KEY = "sk-test-openai"
-
-
-class MockSettingsNoKeys:
-    QUERY_LLM_PROVIDER = "deepseek"
-    QUERY_LLM_MODEL = "deepseek-reasoner"
-    QUERY_LLM_TEMPERATURE = 0.0
-    QUERY_LLM_MAX_TOKENS = 2048
-    QUERY_MAX_RETRIES = 3
-    DEEPSEEK_API_KEY = None
-    DEEPSEEK_BASE_URL = "https://api.deepseek.com/v1"
-    QWEN_API_KEY = None
-    QWEN_BASE_URL = "https://dashscope.aliyuncs.com/compatible-mode/v1"
-    GEMMA_API_KEY = None
-    GEMMA_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai"
-    OPENAI_API_KEY = None
+    QUERY_LLM_PROVIDER: str = "deepseek"
+    QUERY_LLM_MODEL: str = "deepseek-reasoner"
+    QUERY_LLM_TEMPERATURE: float = 0.0
+    QUERY_LLM_MAX_TOKENS: int = 2048
+    QUERY_MAX_RETRIES: int = 3
+    DEEPSEEK_API_KEY: Optional[str] = "sk-test-deepseek"
+    DEEPSEEK_BASE_URL: str = "https://api.deepseek.com/v1"
+    QWEN_API_KEY: Optional[str] = "sk-test-qwen"
+    QWEN_BASE_URL: str = "https://dashscope.aliyuncs.com/compatible-mode/v1"
+    GEMMA_API_KEY: Optional[str] = "sk-test-gemma"
+    GEMMA_BASE_URL: str = "https://generativelanguage.googleapis.com/v1beta/openai"
+    OPENAI_API_KEY: Optional[str] = "sk-test-openai"
+
+
+# Frozen, so one instance of each is shared by every test; tests that need
+# a different value derive a copy with dataclasses.replace.
+_SETTINGS = MockSettings()
+_SETTINGS_NO_KEYS = replace(
+    _SETTINGS,
+    DEEPSEEK_API_KEY=None,
+    QWEN_API_KEY=None,
+    GEMMA_API_KEY=None,
+    OPENAI_API_KEY=None,
+)
 
 
 @pytest.fixture
 def settings():
-    return MockSettings()
+    return _SETTINGS
 
 
 @pytest.fixture
 def settings_no_keys():
-    return MockSettingsNoKeys()
+    return _SETTINGS_NO_KEYS
+
+
+# Expected error messages, compiled once for pytest.raises(match=...)
+_UNKNOWN_PROVIDER_RE = re.compile("Unknown LLM provider")
+_MISSING_KEY_RE = re.compile("API key not configured")
+
+
+def _mock_llm_response(content):
+    """Build an OpenAI-shaped chat completion response (plain attributes, no MagicMock)."""
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
 
 
 # ═════════════════════════════════════════════════════════════════════════════
@@ -119,41 +133,36 @@ LIMIT 1000;
 # ═════════════════════════════════════════════════════════════════════════════
 
 class TestGetLlmClient:
+    @pytest.fixture(autouse=True)
+    def _fresh_client_cache(self):
+        _build_client.cache_clear()
+        yield
+        _build_client.cache_clear()
+
+    @pytest.mark.parametrize(
+        "provider,api_key,base_url",
+        [
+            ("deepseek", "sk-test-deepseek", "https://api.deepseek.com/v1"),
+            ("qwen", "sk-test-qwen", "https://dashscope.aliyuncs.com/compatible-mode/v1"),
+            ("gemma", "sk-test-gemma", "https://generativelanguage.googleapis.com/v1beta/openai"),
+            ("openai", "sk-test-openai", None),
+        ],
+        ids=["deepseek", "qwen", "gemma", "openai"],
+    )
     @patch("app.query.pipeline.OpenAI")
-    def test_deepseek_client(self, mock_openai_cls, settings):
-        get_llm_client("deepseek", settings)
-        mock_openai_cls.assert_called_once_with(
-            api_key="sk-test-deepseek",
-            base_url="https://api.deepseek.com/v1",
-        )
-
-    @patch("app.query.pipeline.OpenAI")
-    def test_qwen_client(self, mock_openai_cls, settings):
-        get_llm_client("qwen", settings)
-        mock_openai_cls.assert_called_once_with(
-            api_key="sk-test-qwen",
-            base_url="https://dashscope.aliyuncs.com/compatible-mode/v1",
-        )
-
-    @patch("app.query.pipeline.OpenAI")
-    def test_gemma_client(self, mock_openai_cls, settings):
-        get_llm_client("gemma", settings)
-        mock_openai_cls.assert_called_once_with(
-            api_key="sk-test-gemma",
-            base_url="https://generativelanguage.googleapis.com/v1beta/openai",
-        )
-
-    @patch("app.query.pipeline.OpenAI")
-    def test_openai_client(self, mock_openai_cls, settings):
-        get_llm_client("openai", settings)
-        mock_openai_cls.assert_called_once_with(api_key="sk-test-openai")
+    def test_client_construction(self, mock_openai_cls, provider, api_key, base_url, settings):
+        get_llm_client(provider, settings)
+        expected = {"api_key": api_key}
+        if base_url:
+            expected["base_url"] = base_url
+        mock_openai_cls.assert_called_once_with(**expected)
 
     def test_unknown_provider_raises(self, settings):
-        with pytest.raises(ValueError, match="Unknown LLM provider"):
+        with pytest.raises(ValueError, match=_UNKNOWN_PROVIDER_RE):
             get_llm_client("claude", settings)
 
     def test_missing_api_key_raises(self, settings_no_keys):
-        with pytest.raises(ValueError, match="API key not configured"):
+        with pytest.raises(ValueError, match=_MISSING_KEY_RE):
             get_llm_client("deepseek", settings_no_keys)
 
     @patch("app.query.pipeline.OpenAI")
@@ -161,6 +170,13 @@ class TestGetLlmClient:
         get_llm_client("DeepSeek", settings)
         mock_openai_cls.assert_called_once()
 
+    @patch("app.query.pipeline.OpenAI")
+    def test_client_reused_across_calls(self, mock_openai_cls, settings):
+        first = get_llm_client("qwen", settings)
+        second = get_llm_client("qwen", settings)
+        assert first is second
+        mock_openai_cls.assert_called_once()
+
 
 # ═════════════════════════════════════════════════════════════════════════════
 # _get_model
@@ -182,6 +198,17 @@ class TestGetModel:
     def test_openai_default(self, settings):
         assert _get_model("openai", None, settings) == "gpt-4o"
 
+    def test_repeat_lookup_served_from_cache(self, settings):
+        _resolve_model.cache_clear()
+        _get_model("qwen", None, settings)
+        _get_model("qwen", None, settings)
+        assert _resolve_model.cache_info().hits == 1
+
+    def test_settings_model_change_not_masked_by_cache(self, settings):
+        _get_model("deepseek", None, settings)
+        changed = replace(settings, QUERY_LLM_MODEL="deepseek-chat")
+        assert _get_model("deepseek", None, changed) == "deepseek-chat"
+
 
 # ═════════════════════════════════════════════════════════════════════════════
 # _build_messages
@@ -223,21 +250,11 @@ class TestBuildMessages:
 # ═════════════════════════════════════════════════════════════════════════════
 
 class TestNlToSql:
-    def _mock_llm_response(self, content):
-        """Create a mock OpenAI chat completion response."""
-        mock_message = MagicMock()
-        mock_message.content = content
-        mock_choice = MagicMock()
-        mock_choice.message = mock_message
-        mock_response = MagicMock()
-        mock_response.choices = [mock_choice]
-        return mock_response
-
     @pytest.mark.asyncio
     @patch("app.query.pipeline.get_llm_client")
     async def test_successful_pipeline(self, mock_get_client, settings):
         mock_client = MagicMock()
-        mock_client.chat.completions.create.return_value = self._mock_llm_response(
+        mock_client.chat.completions.create.return_value = _mock_llm_response(
             "```sql\nSELECT * FROM floats LIMIT 10\n```"
         )
         mock_get_client.return_value = mock_client
@@ -249,14 +266,32 @@ class TestNlToSql:
         assert result.retries_used == 0
         assert result.provider == "deepseek"
 
+    @pytest.mark.asyncio
+    @patch("app.query.pipeline.get_llm_client")
+    async def test_llm_call_runs_off_event_loop(self, mock_get_client, settings):
+        call_threads = []
+
+        def _create(**kwargs):
+            call_threads.append(threading.current_thread())
+            return _mock_llm_response("```sql\nSELECT * FROM floats\n```")
+
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.side_effect = _create
+        mock_get_client.return_value = mock_client
+
+        result = await nl_to_sql("Show floats", [], None, settings)
+
+        assert result.sql == "SELECT * FROM floats"
+        assert call_threads and call_threads[0] is not threading.current_thread()
+
     @pytest.mark.asyncio
     @patch("app.query.pipeline.get_llm_client")
     async def test_retry_on_extraction_failure(self, mock_get_client, settings):
         mock_client = MagicMock()
         # First call: no SQL, second call: valid SQL
         mock_client.chat.completions.create.side_effect = [
-            self._mock_llm_response("I don't know how to help"),
-            self._mock_llm_response("```sql\nSELECT * FROM floats\n```"),
+            _mock_llm_response("I don't know how to help"),
+            _mock_llm_response("```sql\nSELECT * FROM floats\n```"),
         ]
         mock_get_client.return_value = mock_client
 
@@ -272,8 +307,8 @@ class TestNlToSql:
         mock_client = MagicMock()
         # First: invalid SQL (references bad table), second: valid SQL
         mock_client.chat.completions.create.side_effect = [
-            self._mock_llm_response("```sql\nSELECT * FROM evil_table\n```"),
-            self._mock_llm_response("```sql\nSELECT * FROM floats\n```"),
+            _mock_llm_response("```sql\nSELECT * FROM evil_table\n```"),
+            _mock_llm_response("```sql\nSELECT * FROM floats\n```"),
         ]
         mock_get_client.return_value = mock_client
 
@@ -285,10 +320,10 @@ class TestNlToSql:
     @pytest.mark.asyncio
     @patch("app.query.pipeline.get_llm_client")
     async def test_exhausted_retries(self, mock_get_client, settings):
-        settings.QUERY_MAX_RETRIES = 2
+        settings = replace(settings, QUERY_MAX_RETRIES=2)
         mock_client = MagicMock()
         # All attempts return invalid SQL
-        mock_client.chat.completions.create.return_value = self._mock_llm_response(
+        mock_client.chat.completions.create.return_value = _mock_llm_response(
             "```sql\nDELETE FROM floats\n```"
         )
         mock_get_client.return_value = mock_client
@@ -323,7 +358,7 @@ class TestNlToSql:
     @patch("app.query.pipeline.get_llm_client")
     async def test_provider_override(self, mock_get_client, settings):
         mock_client = MagicMock()
-        mock_client.chat.completions.create.return_value = self._mock_llm_response(
+        mock_client.chat.completions.create.return_value = _mock_llm_response(
             "```sql\nSELECT 1\n```"
         )
         mock_get_client.return_value = mock_client
@@ -345,13 +380,9 @@ class TestInterpretResults:
     @patch("app.query.pipeline.get_llm_client")
     async def test_successful_interpretation(self, mock_get_client, settings):
         mock_client = MagicMock()
-        mock_message = MagicMock()
-        mock_message.content = "The query found 5 BGC floats deployed by India."
-        mock_choice = MagicMock()
-        mock_choice.message = mock_message
-        mock_response = MagicMock()
-        mock_response.choices = [mock_choice]
-        mock_client.chat.completions.create.return_value = mock_response
+        mock_client.chat.completions.create.return_value = _mock_llm_response(
+            "The query found 5 BGC floats deployed by India."
+        )
         mock_get_client.return_value = mock_client
 
         result = await interpret_results(
@@ -14,6 +14,62 @@ import pytest
 from sqlalchemy import text
 
 
+# ============================================================================
+# Catalog snapshot — every catalog the existence tests need, fetched in a
+# single UNION ALL round trip and shared by the parametrized tests below.
+# Read-only, so it uses the engine directly rather than pg_session.
+# ============================================================================
+_CATALOG_SQL = text(
+    "SELECT 'table', tablename, NULL FROM pg_tables WHERE schemaname = 'public'"
+    " UNION ALL SELECT 'index', indexname, NULL FROM pg_indexes"
+    " UNION ALL SELECT 'matview', matviewname, NULL FROM pg_matviews"
+    "   WHERE schemaname = 'public'"
+    " UNION ALL SELECT 'extension', extname, NULL FROM pg_extension"
+    " UNION ALL SELECT 'column', table_name || '.' || column_name, data_type"
+    "   FROM information_schema.columns WHERE table_schema = 'public'"
+)
+
+
+@pytest.fixture(scope="module")
+def catalog(pg_engine) -> dict[str, dict[str, str | None]]:
+    """Map each object kind to {name: detail} (detail is the column data type)."""
+    snapshot: dict[str, dict[str, str | None]] = {
+        "table": {}, "index": {}, "matview": {}, "extension": {}, "column": {},
+    }
+    with pg_engine.connect() as conn:
+        for kind, name, detail in conn.execute(_CATALOG_SQL):
+            snapshot[kind][name] = detail
+    return snapshot
+
+
+@pytest.fixture(scope="module")
+def public_tables(catalog) -> set[str]:
+    return set(catalog["table"])
+
+
+@pytest.fixture(scope="module")
+def all_indexes(catalog) -> set[str]:
+    return set(catalog["index"])
+
+
+@pytest.fixture(scope="module")
+def public_matviews(catalog) -> set[str]:
+    return set(catalog["matview"])
+
+
+@pytest.fixture(scope="module")
+def enabled_extensions(catalog) -> set[str]:
+    return set(catalog["extension"])
+
+
+@pytest.fixture(scope="module")
+def column_types(catalog) -> dict[tuple[str, str], str]:
+    return {
+        tuple(name.split(".", 1)): dtype
+        for name, dtype in catalog["column"].items()
+    }
+
+
 # ============================================================================
 # Table existence (8 tables total)
 # ============================================================================
@@ -30,18 +86,9 @@ EXPECTED_TABLES = [
 
 
 @pytest.mark.parametrize("table_name", EXPECTED_TABLES)
-def test_table_exists(pg_session, table_name):
+def test_table_exists(public_tables, table_name):
     """All 8 tables must exist in the public schema."""
-    exists = pg_session.execute(
-        text(
-            "SELECT EXISTS ("
-            "  SELECT 1 FROM pg_tables"
-            "  WHERE schemaname = 'public' AND tablename = :name"
-            ")"
-        ),
-        {"name": table_name},
-    ).scalar()
-    assert exists, f"Table '{table_name}' not found"
+    assert table_name in public_tables, f"Table '{table_name}' not found"
 
 
 # ============================================================================
@@ -57,13 +104,9 @@ EXPECTED_GIST_INDEXES = [
 
 
 @pytest.mark.parametrize("index_name", EXPECTED_GIST_INDEXES)
-def test_gist_index_exists(pg_session, index_name):
+def test_gist_index_exists(all_indexes, index_name):
     """All GiST spatial indexes must be present."""
-    exists = pg_session.execute(
-        text("SELECT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = :name)"),
-        {"name": index_name},
-    ).scalar()
-    assert exists, f"GiST index '{index_name}' not found"
+    assert index_name in all_indexes, f"GiST index '{index_name}' not found"
 
 
 # ============================================================================
@@ -95,13 +138,9 @@ EXPECTED_BTREE_INDEXES = [
 
 
 @pytest.mark.parametrize("index_name", EXPECTED_BTREE_INDEXES)
-def test_btree_index_exists(pg_session, index_name):
+def test_btree_index_exists(all_indexes, index_name):
     """B-tree indexes must exist for join and filter performance."""
-    exists = pg_session.execute(
-        text("SELECT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = :name)"),
-        {"name": index_name},
-    ).scalar()
-    assert exists, f"B-tree index '{index_name}' not found"
+    assert index_name in all_indexes, f"B-tree index '{index_name}' not found"
 
 
 # ============================================================================
@@ -115,13 +154,9 @@ EXPECTED_PARTIAL_INDEXES = [
 
 
 @pytest.mark.parametrize("index_name", EXPECTED_PARTIAL_INDEXES)
-def test_partial_index_exists(pg_session, index_name):
+def test_partial_index_exists(all_indexes, index_name):
     """Partial indexes must exist for filtered queries."""
-    exists = pg_session.execute(
-        text("SELECT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = :name)"),
-        {"name": index_name},
-    ).scalar()
-    assert exists, f"Partial index '{index_name}' not found"
+    assert index_name in all_indexes, f"Partial index '{index_name}' not found"
 
 
 # ============================================================================
@@ -158,40 +193,33 @@ def test_float_positions_unique_constraint(pg_session):
 # ============================================================================
 # CASCADE DELETE: profiles → measurements
 # ============================================================================
+@pytest.mark.xdist_group("pg_write")
 def test_cascade_delete_measurements(pg_session):
     """Deleting a profile must cascade-delete its child measurements."""
     db = pg_session
 
-    # Insert prerequisite rows via raw SQL
-    db.execute(text("INSERT INTO floats (platform_number) VALUES ('CASCTEST001')"))
-    float_id = db.execute(
-        text("SELECT float_id FROM floats WHERE platform_number = 'CASCTEST001'")
-    ).scalar()
-
-    db.execute(text("INSERT INTO datasets (name) VALUES ('cascade_test')"))
-    dataset_id = db.execute(
-        text("SELECT dataset_id FROM datasets WHERE name = 'cascade_test'")
-    ).scalar()
-
-    db.execute(
-        text(
-            "INSERT INTO profiles (float_id, platform_number, cycle_number, dataset_id)"
-            " VALUES (:fid, 'CASCTEST001', 99, :did)"
-        ),
-        {"fid": float_id, "did": dataset_id},
-    )
+    # Insert the float → dataset → profile → measurement chain in one
+    # statement; each CTE feeds its generated key to the next
     profile_id = db.execute(
         text(
-            "SELECT profile_id FROM profiles"
-            " WHERE platform_number = 'CASCTEST001' AND cycle_number = 99"
+            "WITH f AS ("
+            "  INSERT INTO floats (platform_number) VALUES ('CASCTEST001')"
+            "  RETURNING float_id"
+            "), d AS ("
+            "  INSERT INTO datasets (name) VALUES ('cascade_test')"
+            "  RETURNING dataset_id"
+            "), p AS ("
+            "  INSERT INTO profiles (float_id, platform_number, cycle_number, dataset_id)"
+            "  SELECT f.float_id, 'CASCTEST001', 99, d.dataset_id FROM f, d"
+            "  RETURNING profile_id"
+            "), m AS ("
+            "  INSERT INTO measurements (profile_id, pressure)"
+            "  SELECT profile_id, 100.0 FROM p"
+            ")"
+            " SELECT profile_id FROM p"
         )
     ).scalar()
 
-    # Insert a measurement linked to the profile
-    db.execute(
-        text("INSERT INTO measurements (profile_id, pressure) VALUES (:pid, 100.0)"),
-        {"pid": profile_id},
-    )
     assert (
         db.execute(
             text("SELECT COUNT(*) FROM measurements WHERE profile_id = :pid"),
@@ -226,18 +254,9 @@ EXPECTED_MATVIEWS = [
 
 
 @pytest.mark.parametrize("view_name", EXPECTED_MATVIEWS)
-def test_materialized_view_exists(pg_session, view_name):
+def test_materialized_view_exists(public_matviews, view_name):
     """Both materialized views must exist in the public schema."""
-    exists = pg_session.execute(
-        text(
-            "SELECT EXISTS ("
-            "  SELECT 1 FROM pg_matviews"
-            "  WHERE schemaname = 'public' AND matviewname = :name"
-            ")"
-        ),
-        {"name": view_name},
-    ).scalar()
-    assert exists, f"Materialized view '{view_name}' not found"
+    assert view_name in public_matviews, f"Materialized view '{view_name}' not found"
 
 
 # ============================================================================
@@ -251,15 +270,9 @@ BIGINT_COLUMNS = [
 
 
 @pytest.mark.parametrize("table_name,column_name", BIGINT_COLUMNS)
-def test_bigint_column(pg_session, table_name, column_name):
+def test_bigint_column(column_types, table_name, column_name):
     """Selected columns must be BIGINT after migration 002."""
-    dtype = pg_session.execute(
-        text(
-            "SELECT data_type FROM information_schema.columns"
-            " WHERE table_name = :tbl AND column_name = :col"
-        ),
-        {"tbl": table_name, "col": column_name},
-    ).scalar()
+    dtype = column_types.get((table_name, column_name))
     assert dtype == "bigint", f"{table_name}.{column_name} is '{dtype}', expected 'bigint'"
 
 
@@ -270,14 +283,6 @@ EXPECTED_EXTENSIONS = ["postgis", "pgcrypto", "pg_trgm"]
 
 
 @pytest.mark.parametrize("ext_name", EXPECTED_EXTENSIONS)
-def test_extension_enabled(pg_session, ext_name):
+def test_extension_enabled(enabled_extensions, ext_name):
     """Required PostgreSQL extensions must be enabled."""
-    exists = pg_session.execute(
-        text(
-            "SELECT EXISTS ("
-            "  SELECT 1 FROM pg_extension WHERE extname = :name"
-            ")"
-        ),
-        {"name": ext_name},
-    ).scalar()
-    assert exists, f"Extension '{ext_name}' is not enabled"
+    assert ext_name in enabled_extensions, f"Extension '{ext_name}' is not enabled"
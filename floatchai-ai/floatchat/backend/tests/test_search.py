@@ -15,8 +15,11 @@ from datetime import datetime, timedelta, timezone
 from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
+import numpy as np
 import pytest
 
+from app.search.search import search_datasets, search_floats
+
 
 # ── Helpers ──────────────────────────────────────────────────────────────────
 
@@ -26,7 +29,7 @@ def _make_row(
     cosine_distance,
     name="Test Dataset",
     variable_list=None,
-    ingestion_date=None,
+    is_recent=False,
     bbox=None,
     date_range_start=None,
     date_range_end=None,
@@ -41,7 +44,7 @@ def _make_row(
         cosine_distance=cosine_distance,
         name=name,
         variable_list=variable_list or {"temperature": True},
-        ingestion_date=ingestion_date or datetime(2025, 1, 1, tzinfo=timezone.utc),
+        is_recent=is_recent,
         bbox=bbox,
         date_range_start=date_range_start or datetime(2024, 6, 1, tzinfo=timezone.utc),
         date_range_end=date_range_end or datetime(2025, 6, 1, tzinfo=timezone.utc),
@@ -75,6 +78,12 @@ def _make_float_row(
     )
 
 
+def _fake_db(rows):
+    """Build a minimal Session stand-in whose execute(...).all() returns rows."""
+    result = SimpleNamespace(all=lambda: rows)
+    return SimpleNamespace(execute=lambda *args, **kwargs: result)
+
+
 # Settings override for all tests — no real threshold / boost issues
 _TEST_SETTINGS = {
     "SEARCH_DEFAULT_LIMIT": 10,
@@ -85,21 +94,24 @@ _TEST_SETTINGS = {
     "REGION_MATCH_BOOST_VALUE": 0.10,
     "EMBEDDING_BATCH_SIZE": 100,
     "EMBEDDING_MODEL": "text-embedding-3-small",
+    "QUERY_EMBEDDING_CACHE_TTL_SECONDS": 86400,
 }
 
 
+@pytest.fixture
+def search_settings():
+    """Patch the search module's settings with a fresh namespace of _TEST_SETTINGS."""
+    namespace = SimpleNamespace(**_TEST_SETTINGS)
+    with patch("app.search.search.settings", new=namespace):
+        yield namespace
+
+
 # ── Test 6: Results sorted by score descending ──────────────────────────────
 
 
 class TestSearchDatasetsSorting:
     @patch("app.search.search.embed_single")
-    @patch("app.search.search.settings")
-    def test_results_sorted_by_score_descending(self, mock_settings, mock_embed):
-        from app.search.search import search_datasets
-
-        for k, v in _TEST_SETTINGS.items():
-            setattr(mock_settings, k, v)
-
+    def test_results_sorted_by_score_descending(self, mock_embed, search_settings):
         mock_embed.return_value = [0.1] * 1536
 
         # Create rows with different cosine distances (lower = more similar)
@@ -109,8 +121,7 @@ class TestSearchDatasetsSorting:
             _make_row(dataset_id=3, cosine_distance=0.35),  # score ~0.65
         ]
 
-        mock_db = MagicMock()
-        mock_db.execute.return_value.all.return_value = rows
+        mock_db = _fake_db(rows)
 
         results = search_datasets("ocean data", mock_db, MagicMock())
 
@@ -118,19 +129,31 @@ class TestSearchDatasetsSorting:
         assert scores == sorted(scores, reverse=True)
         assert len(results) == 3
 
+    @patch("app.search.search.embed_single")
+    def test_equal_scores_keep_distance_order(self, mock_embed, search_settings):
+        mock_embed.return_value = [0.1] * 1536
+
+        rows = [
+            _make_row(dataset_id=1, cosine_distance=0.2),
+            _make_row(dataset_id=2, cosine_distance=0.2),
+            _make_row(dataset_id=3, cosine_distance=0.1),
+        ]
+
+        mock_db = _fake_db(rows)
+
+        results = search_datasets("ocean data", mock_db, MagicMock())
+
+        assert [r["dataset_id"] for r in results] == [3, 1, 2]
+        assert [r["score"] for r in results] == [0.9, 0.8, 0.8]
+
 
 # ── Test 7: Results below threshold excluded ────────────────────────────────
 
 
 class TestSearchThresholdFiltering:
     @patch("app.search.search.embed_single")
-    @patch("app.search.search.settings")
-    def test_results_below_threshold_excluded(self, mock_settings, mock_embed):
-        from app.search.search import search_datasets
-
-        for k, v in _TEST_SETTINGS.items():
-            setattr(mock_settings, k, v)
-        mock_settings.SEARCH_SIMILARITY_THRESHOLD = 0.5
+    def test_results_below_threshold_excluded(self, mock_embed, search_settings):
+        search_settings.SEARCH_SIMILARITY_THRESHOLD = 0.5
 
         mock_embed.return_value = [0.1] * 1536
 
@@ -140,33 +163,41 @@ class TestSearchThresholdFiltering:
             _make_row(dataset_id=3, cosine_distance=0.55),  # score=0.45 → below 0.5
         ]
 
-        mock_db = MagicMock()
-        mock_db.execute.return_value.all.return_value = rows
+        mock_db = _fake_db(rows)
 
         results = search_datasets("test", mock_db, MagicMock())
 
         assert len(results) == 1
         assert results[0]["dataset_id"] == 1
 
+    @patch("app.search.search.embed_single")
+    def test_threshold_pushed_into_sql(self, mock_embed, search_settings):
+        """The distance bound allows for the recency boost but nothing more."""
+        search_settings.SEARCH_SIMILARITY_THRESHOLD = 0.5
+
+        mock_embed.return_value = [0.1] * 1536
+
+        mock_db = MagicMock()
+        mock_db.execute.return_value.all.return_value = []
+
+        search_datasets("test", mock_db, MagicMock())
+
+        stmt = mock_db.execute.call_args[0][0]
+        assert stmt.compile().params["max_dist"] == pytest.approx(0.55)
+
 
 # ── Test 8: Variable filter excludes non-matching datasets ──────────────────
 
 
 class TestSearchVariableFilter:
     @patch("app.search.search.embed_single")
-    @patch("app.search.search.settings")
-    def test_variable_filter_applied_in_sql(self, mock_settings, mock_embed):
+    def test_variable_filter_applied_in_sql(self, mock_embed, search_settings):
         """
         The variable filter is applied at the SQL level. We verify that
         passing a variable filter calls execute with the right statement
         by checking that the mock DB is invoked (the actual SQL filtering
         is tested in integration tests).
         """
-        from app.search.search import search_datasets
-
-        for k, v in _TEST_SETTINGS.items():
-            setattr(mock_settings, k, v)
-
         mock_embed.return_value = [0.1] * 1536
 
         # Return rows that already passed the SQL filter (mock)
@@ -198,17 +229,11 @@ class TestSearchVariableFilter:
 
 class TestSearchDateFromFilter:
     @patch("app.search.search.embed_single")
-    @patch("app.search.search.settings")
-    def test_date_from_filter_applied(self, mock_settings, mock_embed):
+    def test_date_from_filter_applied(self, mock_embed, search_settings):
         """
         The date_from filter is applied at SQL level. We verify the mock
         flow works and that the returned results reflect the filter.
         """
-        from app.search.search import search_datasets
-
-        for k, v in _TEST_SETTINGS.items():
-            setattr(mock_settings, k, v)
-
         mock_embed.return_value = [0.1] * 1536
 
         # Simulate: only datasets whose date_range_end >= date_from survive
@@ -240,33 +265,16 @@ class TestSearchDateFromFilter:
 
 class TestSearchRecencyBoost:
     @patch("app.search.search.embed_single")
-    @patch("app.search.search.settings")
-    def test_recency_boost_increases_score(self, mock_settings, mock_embed):
-        from app.search.search import search_datasets
-
-        for k, v in _TEST_SETTINGS.items():
-            setattr(mock_settings, k, v)
-
+    def test_recency_boost_increases_score(self, mock_embed, search_settings):
         mock_embed.return_value = [0.1] * 1536
 
-        now = datetime.now(timezone.utc)
-
         # Both datasets have the same cosine distance
         rows = [
-            _make_row(
-                dataset_id=1,
-                cosine_distance=0.35,
-                ingestion_date=now - timedelta(days=10),  # recent → gets boost
-            ),
-            _make_row(
-                dataset_id=2,
-                cosine_distance=0.35,
-                ingestion_date=now - timedelta(days=365),  # old → no boost
-            ),
+            _make_row(dataset_id=1, cosine_distance=0.35, is_recent=True),
+            _make_row(dataset_id=2, cosine_distance=0.35, is_recent=False),
         ]
 
-        mock_db = MagicMock()
-        mock_db.execute.return_value.all.return_value = rows
+        mock_db = _fake_db(rows)
 
         results = search_datasets("test", mock_db, MagicMock())
 
@@ -276,19 +284,27 @@ class TestSearchRecencyBoost:
         old = next(r for r in results if r["dataset_id"] == 2)
         assert recent["score"] > old["score"]
 
+    @patch("app.search.search.embed_single")
+    def test_recency_cutoff_bound_in_sql(self, mock_embed, search_settings):
+        mock_embed.return_value = [0.1] * 1536
+
+        mock_db = MagicMock()
+        mock_db.execute.return_value.all.return_value = []
+
+        search_datasets("test", mock_db, MagicMock())
+
+        stmt = mock_db.execute.call_args[0][0]
+        cutoff = stmt.compile().params["recency_cutoff"]
+        expected = datetime.now(timezone.utc) - timedelta(days=90)
+        assert abs(cutoff - expected) < timedelta(minutes=1)
+
 
 # ── Test 11: Limit respected and capped at max ─────────────────────────────
 
 
 class TestSearchLimit:
     @patch("app.search.search.embed_single")
-    @patch("app.search.search.settings")
-    def test_limit_respected(self, mock_settings, mock_embed):
-        from app.search.search import search_datasets
-
-        for k, v in _TEST_SETTINGS.items():
-            setattr(mock_settings, k, v)
-
+    def test_limit_respected(self, mock_embed, search_settings):
         mock_embed.return_value = [0.1] * 1536
 
         rows = [
@@ -296,26 +312,19 @@ class TestSearchLimit:
             for i in range(20)
         ]
 
-        mock_db = MagicMock()
-        mock_db.execute.return_value.all.return_value = rows
+        mock_db = _fake_db(rows)
 
         results = search_datasets("test", mock_db, MagicMock(), limit=3)
         assert len(results) == 3
 
-    def test_limit_exceeds_max_raises_value_error(self):
-        from app.search.search import search_datasets
-
-        with patch("app.search.search.settings") as mock_settings:
-            for k, v in _TEST_SETTINGS.items():
-                setattr(mock_settings, k, v)
-
-            with pytest.raises(ValueError, match="exceeds maximum"):
-                search_datasets(
-                    "test",
-                    MagicMock(),
-                    MagicMock(),
-                    limit=100,  # exceeds SEARCH_MAX_LIMIT = 50
-                )
+    def test_limit_exceeds_max_raises_value_error(self, search_settings):
+        with pytest.raises(ValueError, match="exceeds maximum"):
+            search_datasets(
+                "test",
+                MagicMock(),
+                MagicMock(),
+                limit=100,  # exceeds SEARCH_MAX_LIMIT = 50
+            )
 
 
 # ── Test 12: Empty list when no results meet threshold ──────────────────────
@@ -323,13 +332,8 @@ class TestSearchLimit:
 
 class TestSearchEmptyResults:
     @patch("app.search.search.embed_single")
-    @patch("app.search.search.settings")
-    def test_empty_list_when_no_results_meet_threshold(self, mock_settings, mock_embed):
-        from app.search.search import search_datasets
-
-        for k, v in _TEST_SETTINGS.items():
-            setattr(mock_settings, k, v)
-        mock_settings.SEARCH_SIMILARITY_THRESHOLD = 0.9  # very high threshold
+    def test_empty_list_when_no_results_meet_threshold(self, mock_embed, search_settings):
+        search_settings.SEARCH_SIMILARITY_THRESHOLD = 0.9  # very high threshold
 
         mock_embed.return_value = [0.1] * 1536
 
@@ -339,26 +343,33 @@ class TestSearchEmptyResults:
             _make_row(dataset_id=2, cosine_distance=0.75),  # score=0.25
         ]
 
-        mock_db = MagicMock()
-        mock_db.execute.return_value.all.return_value = rows
+        mock_db = _fake_db(rows)
 
         results = search_datasets("test", mock_db, MagicMock())
 
         assert results == []
 
     @patch("app.search.search.embed_single")
-    @patch("app.search.search.settings")
-    def test_empty_list_when_no_candidates(self, mock_settings, mock_embed):
-        from app.search.search import search_datasets
-
-        for k, v in _TEST_SETTINGS.items():
-            setattr(mock_settings, k, v)
+    def test_region_filter_widens_sql_bound(self, mock_embed, search_settings):
+        search_settings.SEARCH_SIMILARITY_THRESHOLD = 0.9
 
         mock_embed.return_value = [0.1] * 1536
 
         mock_db = MagicMock()
         mock_db.execute.return_value.all.return_value = []
 
+        with patch("app.search.search._resolve_region_polygon", return_value=None):
+            search_datasets("test", mock_db, MagicMock(), filters={"region_name": "x"})
+
+        stmt = mock_db.execute.call_args[0][0]
+        assert stmt.compile().params["max_dist"] == pytest.approx(0.25)
+
+    @patch("app.search.search.embed_single")
+    def test_empty_list_when_no_candidates(self, mock_embed, search_settings):
+        mock_embed.return_value = [0.1] * 1536
+
+        mock_db = _fake_db([])
+
         results = search_datasets("nonexistent data", mock_db, MagicMock())
         assert results == []
 
@@ -368,13 +379,7 @@ class TestSearchEmptyResults:
 
 class TestSearchFloats:
     @patch("app.search.search.embed_single")
-    @patch("app.search.search.settings")
-    def test_returns_sorted_results(self, mock_settings, mock_embed):
-        from app.search.search import search_floats
-
-        for k, v in _TEST_SETTINGS.items():
-            setattr(mock_settings, k, v)
-
+    def test_returns_sorted_results(self, mock_embed, search_settings):
         mock_embed.return_value = [0.1] * 1536
 
         rows = [
@@ -383,8 +388,7 @@ class TestSearchFloats:
             _make_float_row(float_id=3, cosine_distance=0.3),
         ]
 
-        mock_db = MagicMock()
-        mock_db.execute.return_value.all.return_value = rows
+        mock_db = _fake_db(rows)
 
         results = search_floats("BGC floats", mock_db, MagicMock())
 
@@ -392,13 +396,8 @@ class TestSearchFloats:
         assert scores == sorted(scores, reverse=True)
 
     @patch("app.search.search.embed_single")
-    @patch("app.search.search.settings")
-    def test_below_threshold_excluded(self, mock_settings, mock_embed):
-        from app.search.search import search_floats
-
-        for k, v in _TEST_SETTINGS.items():
-            setattr(mock_settings, k, v)
-        mock_settings.SEARCH_SIMILARITY_THRESHOLD = 0.6
+    def test_below_threshold_excluded(self, mock_embed, search_settings):
+        search_settings.SEARCH_SIMILARITY_THRESHOLD = 0.6
 
         mock_embed.return_value = [0.1] * 1536
 
@@ -407,20 +406,48 @@ class TestSearchFloats:
             _make_float_row(float_id=2, cosine_distance=0.8),   # score=0.2 → below
         ]
 
-        mock_db = MagicMock()
-        mock_db.execute.return_value.all.return_value = rows
+        mock_db = _fake_db(rows)
 
         results = search_floats("test", mock_db, MagicMock())
 
         assert len(results) == 1
         assert results[0]["float_id"] == 1
 
-    def test_limit_exceeds_max_raises(self):
-        from app.search.search import search_floats
+    def test_limit_exceeds_max_raises(self, search_settings):
+        with pytest.raises(ValueError, match="exceeds maximum"):
+            search_floats("test", MagicMock(), MagicMock(), limit=100)
+
+
+# ── Query embedding cache ───────────────────────────────────────────────────
+
+
+class TestQueryEmbeddingCache:
+    @patch("app.search.search.embed_single")
+    def test_cache_hit_skips_openai(self, mock_embed, search_settings):
+        cached = np.full(1536, 0.25, dtype=np.float32)
+        mock_redis = MagicMock()
+        mock_redis.get.return_value = cached.tobytes()
+
+        mock_db = _fake_db([])
+
+        search_datasets("test", mock_db, MagicMock(), redis_client=mock_redis)
+
+        mock_embed.assert_not_called()
+        key = mock_redis.get.call_args[0][0]
+        assert key.startswith("query_embedding_unit:text-embedding-3-small:")
+
+    @patch("app.search.search.embed_single")
+    def test_cache_miss_stores_float32_vector(self, mock_embed, search_settings):
+        mock_embed.return_value = [0.5] * 1536
+        mock_redis = MagicMock()
+        mock_redis.get.return_value = None
+
+        mock_db = _fake_db([])
 
-        with patch("app.search.search.settings") as mock_settings:
-            for k, v in _TEST_SETTINGS.items():
-                setattr(mock_settings, k, v)
+        search_floats("test", mock_db, MagicMock(), redis_client=mock_redis)
 
-            with pytest.raises(ValueError, match="exceeds maximum"):
-                search_floats("test", MagicMock(), MagicMock(), limit=100)
+        mock_embed.assert_called_once()
+        key, payload = mock_redis.set.call_args[0]
+        assert key == mock_redis.get.call_args[0][0]
+        assert np.frombuffer(payload, dtype=np.float32).tolist() == [0.5] * 1536
+        assert mock_redis.set.call_args[1]["ex"] == 86400
@@ -322,6 +322,11 @@ class TestParseSuggestions:
         result = _parse_suggestions(content)
         assert len(result) == 2
 
+    def test_bare_array_with_backticks_skips_code_block_scan(self):
+        content = '["Can I filter by `float_type`?", "Show ```sql``` for this?"]'
+        result = _parse_suggestions(content)
+        assert result == ["Can I filter by `float_type`?", "Show ```sql``` for this?"]
+
     def test_parses_plain_text_questions(self):
         content = "1. What is the average salinity here?\n2. How does temperature vary by depth?\n3. Are there seasonal patterns?"
         result = _parse_suggestions(content)
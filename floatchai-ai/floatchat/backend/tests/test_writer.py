@@ -10,11 +10,15 @@ PostgreSQL + PostGIS. Tests verify:
 - Invalid-position handling
 """
 
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from unittest.mock import MagicMock, call, patch
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
 import uuid
 
 import pytest
+from sqlalchemy.dialects import postgresql
 
 from app.ingestion.cleaner import CleanedMeasurement, CleaningResult, CleaningStats
 from app.ingestion.parser import FloatInfo, MeasurementRecord, ParseResult, ProfileInfo
@@ -32,6 +36,89 @@ from app.ingestion.writer import (
 )
 
 
+# =========================================================================
+# Session fakes
+# =========================================================================
+
+@dataclass
+class _FakeResult:
+    """Result stand-in whose scalar accessors return a preset value."""
+    value: Any = None
+
+    def scalar(self) -> Any:
+        return self.value
+
+    def scalar_one(self) -> Any:
+        return self.value
+
+    def scalar_one_or_none(self) -> Any:
+        return self.value
+
+
+@dataclass
+class _FakeDB:
+    """Session stand-in that records writer calls instead of running SQL.
+
+    ``results`` are handed out by ``execute()`` in order, then every later
+    result returns ``scalar_one_returns``; ``assign_on_add`` is set as
+    attributes on each object passed to ``add()`` to mimic the primary key
+    a flush would generate.
+    """
+    scalar_one_returns: Any = None
+    results: list[_FakeResult] = field(default_factory=list)
+    assign_on_add: dict[str, Any] = field(default_factory=dict)
+    execute_calls: list[Any] = field(default_factory=list)
+    added: list[Any] = field(default_factory=list)
+    bulk_inserts: list[list[dict]] = field(default_factory=list)
+    flush_count: int = 0
+
+    def execute(self, statement: Any, params: Any = None) -> _FakeResult:
+        self.execute_calls.append((statement, params))
+        if self.results:
+            return self.results.pop(0)
+        return _FakeResult(self.scalar_one_returns)
+
+    def flush(self) -> None:
+        self.flush_count += 1
+
+    def add(self, obj: Any) -> None:
+        for name, value in self.assign_on_add.items():
+            setattr(obj, name, value)
+        self.added.append(obj)
+
+    def bulk_insert_mappings(self, mapper: Any, mappings: list[dict]) -> None:
+        self.bulk_inserts.append(mappings)
+
+
+@dataclass
+class _FakeCursor:
+    """DBAPI cursor stand-in that captures COPY payloads."""
+    copies: list[tuple[str, str]] = field(default_factory=list)
+    closed: bool = False
+
+    def copy_expert(self, sql: str, buffer: Any) -> None:
+        self.copies.append((sql, buffer.getvalue()))
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@dataclass
+class _FakePostgresDB(_FakeDB):
+    """_FakeDB bound to psycopg2, so write_measurements takes the COPY path."""
+    cursor: _FakeCursor = field(default_factory=_FakeCursor)
+
+    def get_bind(self) -> Any:
+        return SimpleNamespace(dialect=SimpleNamespace(name="postgresql", driver="psycopg2"))
+
+    def connection(self) -> Any:
+        return SimpleNamespace(connection=SimpleNamespace(cursor=lambda: self.cursor))
+
+
+def _compiled_sql(statement: Any) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
 # =========================================================================
 # Helper factories
 # =========================================================================
@@ -136,23 +223,34 @@ class TestIsValidPosition:
         assert _is_valid_position(90.0, 180.0) is True
         assert _is_valid_position(-90.0, -180.0) is True
 
+    def test_nan_invalid(self):
+        assert _is_valid_position(float("nan"), 0.0) is False
+        assert _is_valid_position(0.0, float("nan")) is False
+
 
 # =========================================================================
 # _create_point_geometry
 # =========================================================================
 class TestCreatePointGeometry:
 
-    def test_returns_wkt_element(self):
+    def test_returns_ewkt_with_srid(self):
         result = _create_point_geometry(35.0, -20.0)
-        # WKTElement wraps the WKT string; check it contains the expected POINT
-        assert "POINT" in str(result)
+        assert result.startswith("SRID=4326;POINT(")
 
     def test_lon_lat_order(self):
         """PostGIS uses (lon, lat), not (lat, lon)."""
         result = _create_point_geometry(35.0, -20.0)
-        wkt = str(result)
-        assert "-20" in wkt
-        assert "35" in wkt
+        assert result == "SRID=4326;POINT(-20.000000 35.000000)"
+
+    def test_precision_is_bounded(self):
+        result = _create_point_geometry(12.3456789012, 0.1 + 0.2)
+        assert result == "SRID=4326;POINT(0.300000 12.345679)"
+
+    def test_repeated_position_is_cached(self):
+        _create_point_geometry.cache_clear()
+        first = _create_point_geometry(35.0, -20.0)
+        assert _create_point_geometry(35.0, -20.0) is first
+        assert _create_point_geometry.cache_info().hits == 1
 
 
 # =========================================================================
@@ -160,23 +258,30 @@ class TestCreatePointGeometry:
 # =========================================================================
 class TestUpsertFloat:
 
-    def test_calls_execute_and_flush(self):
-        db = MagicMock(spec=["execute", "flush"])
-        db.execute.return_value = MagicMock(scalar_one=MagicMock(return_value=42))
+    def test_single_round_trip(self):
+        db = _FakeDB(scalar_one_returns=42)
 
         result = upsert_float(db, platform_number="1234567")
         assert result == 42
-        assert db.execute.call_count == 2  # INSERT + SELECT
-        assert db.flush.call_count >= 1
+        assert len(db.execute_calls) == 1  # INSERT ... RETURNING + lookup in one CTE
+        sql = _compiled_sql(db.execute_calls[0][0])
+        assert "ON CONFLICT (platform_number) DO NOTHING RETURNING" in sql
+        assert "UNION ALL" in sql
+
+    def test_falls_back_to_select_when_insert_lost_race(self):
+        db = _FakeDB(results=[_FakeResult(None), _FakeResult(7)])
+
+        result = upsert_float(db, platform_number="1234567")
+        assert result == 7
+        assert len(db.execute_calls) == 2
 
     def test_wmo_id_defaults_to_platform_number(self):
-        db = MagicMock(spec=["execute", "flush"])
-        db.execute.return_value = MagicMock(scalar_one=MagicMock(return_value=1))
+        db = _FakeDB(scalar_one_returns=1)
 
         upsert_float(db, platform_number="9999999")
         # The first execute call is the INSERT; hard to inspect sqlalchemy stmt
         # but at minimum ensure it doesn't error.
-        assert db.execute.called
+        assert db.execute_calls
 
 
 # =========================================================================
@@ -184,9 +289,8 @@ class TestUpsertFloat:
 # =========================================================================
 class TestUpsertProfile:
 
-    def test_calls_execute_and_flush(self):
-        db = MagicMock(spec=["execute", "flush"])
-        db.execute.return_value = MagicMock(scalar_one=MagicMock(return_value=101))
+    def test_single_upsert_with_geometry(self):
+        db = _FakeDB(scalar_one_returns=101)
 
         profile_info = _make_profile_info()
         float_info = _make_float_info()
@@ -195,21 +299,60 @@ class TestUpsertProfile:
             db, profile_info, float_info, float_id=42, dataset_id=1
         )
         assert result == 101
-        # INSERT, SELECT, UPDATE geom, flush calls
-        assert db.execute.call_count >= 2
-        assert db.flush.call_count >= 1
+        # Row, geometry and profile_id all come from one INSERT ... RETURNING
+        assert len(db.execute_calls) == 1
+        statement = db.execute_calls[0][0]
+        sql = _compiled_sql(statement)
+        assert "ST_GeogFromText" in sql
+        assert "geom = excluded.geom" in sql
+        assert sql.rstrip().endswith("RETURNING profiles.profile_id")
+        params = statement.compile(dialect=postgresql.dialect()).params
+        assert "SRID=4326;POINT(-20.000000 35.000000)" in params.values()
 
     def test_invalid_position_skips_geometry_update(self):
-        """When lat/lon are None, geometry UPDATE should not run."""
-        db = MagicMock(spec=["execute", "flush"])
-        db.execute.return_value = MagicMock(scalar_one=MagicMock(return_value=101))
+        """When lat/lon are None, geometry is neither inserted nor overwritten."""
+        db = _FakeDB(scalar_one_returns=101)
 
         profile_info = _make_profile_info(latitude=None, longitude=None)
         float_info = _make_float_info()
 
         upsert_profile(db, profile_info, float_info, float_id=42, dataset_id=1)
-        # Should have INSERT + SELECT but NOT the geometry UPDATE
-        assert db.execute.call_count == 2
+        assert len(db.execute_calls) == 1
+        assert "geom" not in _compiled_sql(db.execute_calls[0][0])
+
+
+# =========================================================================
+# upsert_float_position
+# =========================================================================
+class TestUpsertFloatPosition:
+
+    def test_single_upsert_with_geometry(self):
+        db = _FakeDB(scalar_one_returns=999)
+
+        profile_info = _make_profile_info()
+        float_info = _make_float_info()
+
+        result = upsert_float_position(db, profile_info, float_info)
+        assert result == 999
+        # Row, geometry and position_id all come from one INSERT ... RETURNING
+        assert len(db.execute_calls) == 1
+        statement = db.execute_calls[0][0]
+        sql = _compiled_sql(statement)
+        assert "ST_GeogFromText" in sql
+        assert "geom = excluded.geom" in sql
+        assert sql.rstrip().endswith("RETURNING float_positions.position_id")
+        params = statement.compile(dialect=postgresql.dialect()).params
+        assert "SRID=4326;POINT(-20.000000 35.000000)" in params.values()
+
+    def test_invalid_position_returns_none(self):
+        """When lat/lon are None, nothing is written."""
+        db = _FakeDB(scalar_one_returns=999)
+
+        profile_info = _make_profile_info(latitude=None, longitude=None)
+        float_info = _make_float_info()
+
+        assert upsert_float_position(db, profile_info, float_info) is None
+        assert not db.execute_calls
 
 
 # =========================================================================
@@ -218,38 +361,86 @@ class TestUpsertProfile:
 class TestWriteMeasurements:
 
     def test_empty_measurements_returns_zero(self):
-        db = MagicMock(spec=["execute", "flush", "bulk_insert_mappings"])
+        db = _FakeDB()
         result = write_measurements(db, profile_id=101, measurements=[])
         assert result == 0
-        db.bulk_insert_mappings.assert_not_called()
+        assert not db.bulk_inserts
 
     def test_deletes_existing_then_inserts(self):
         """Should DELETE old measurements then bulk-insert new ones."""
-        db = MagicMock(spec=["execute", "flush", "bulk_insert_mappings"])
+        db = _FakeDB()
 
         measurements = [_make_cleaned_measurement() for _ in range(5)]
         result = write_measurements(db, profile_id=101, measurements=measurements)
 
         assert result == 5
         # At least one execute for DELETE
-        db.execute.assert_called()
+        assert db.execute_calls
         # bulk_insert_mappings called at least once
-        db.bulk_insert_mappings.assert_called()
+        assert db.bulk_inserts
 
     def test_batch_splitting(self):
         """If batch_size < len(measurements), multiple bulk inserts happen."""
-        db = MagicMock(spec=["execute", "flush", "bulk_insert_mappings"])
+        db = _FakeDB()
 
         # Create many measurements
         measurements = [_make_cleaned_measurement(pressure=float(i)) for i in range(250)]
 
-        with patch("app.ingestion.writer.settings") as mock_settings:
-            mock_settings.DB_INSERT_BATCH_SIZE = 100
-            result = write_measurements(db, profile_id=101, measurements=measurements)
+        result = write_measurements(
+            db, profile_id=101, measurements=measurements, batch_size=100
+        )
 
         assert result == 250
         # 250 / 100 = 3 batches (100, 100, 50)
-        assert db.bulk_insert_mappings.call_count == 3
+        assert [len(batch) for batch in db.bulk_inserts] == [100, 100, 50]
+
+    def test_large_profile_uses_copy(self):
+        """Profiles at/above DB_COPY_MIN_ROWS are streamed via COPY FROM STDIN."""
+        db = _FakePostgresDB()
+        measurements = [
+            _make_cleaned_measurement(pressure=float(i), temperature_flag=(i == 0))
+            for i in range(20)
+        ]
+
+        with patch("app.ingestion.writer.settings") as mock_settings:
+            mock_settings.DB_COPY_MIN_ROWS = 10
+            result = write_measurements(db, profile_id=101, measurements=measurements)
+
+        assert result == 20
+        assert not db.bulk_inserts
+        assert len(db.cursor.copies) == 1
+        sql, payload = db.cursor.copies[0]
+        assert sql.startswith("COPY measurements (profile_id, pressure")
+        lines = payload.splitlines()
+        assert len(lines) == 20
+        assert lines[0] == "101,0.0,15.0,35.0,250.0,,,,t"
+        assert lines[1] == "101,1.0,15.0,35.0,250.0,,,,f"
+        assert db.cursor.closed
+
+    def test_copy_is_default(self):
+        """With default settings every non-empty profile goes through COPY."""
+        db = _FakePostgresDB()
+        measurements = [_make_cleaned_measurement() for _ in range(3)]
+
+        result = write_measurements(db, profile_id=101, measurements=measurements)
+
+        assert result == 3
+        assert len(db.cursor.copies) == 1
+        assert not db.bulk_inserts
+
+    def test_small_profile_skips_copy(self):
+        """Profiles below DB_COPY_MIN_ROWS keep using bulk_insert_mappings."""
+        db = _FakePostgresDB()
+        measurements = [_make_cleaned_measurement() for _ in range(5)]
+
+        with patch("app.ingestion.writer.settings") as mock_settings:
+            mock_settings.DB_COPY_MIN_ROWS = 10
+            mock_settings.DB_INSERT_BATCH_SIZE = 1000
+            result = write_measurements(db, profile_id=101, measurements=measurements)
+
+        assert result == 5
+        assert not db.cursor.copies
+        assert len(db.bulk_inserts) == 1
 
 
 # =========================================================================
@@ -258,18 +449,13 @@ class TestWriteMeasurements:
 class TestWriteDataset:
 
     def test_creates_dataset_and_returns_id(self):
-        db = MagicMock(spec=["add", "flush"])
-
-        # Make flush assign a dataset_id to the added Dataset
-        def side_effect(obj):
-            obj.dataset_id = 77
-
-        db.add.side_effect = lambda obj: setattr(obj, "dataset_id", 77)
+        # Stand in for the flush assigning a dataset_id to the added Dataset
+        db = _FakeDB(assign_on_add={"dataset_id": 77})
 
         result = write_dataset(db, source_filename="test.nc")
         assert result == 77
-        db.add.assert_called_once()
-        db.flush.assert_called_once()
+        assert len(db.added) == 1
+        assert db.flush_count == 1
 
 
 # =========================================================================
@@ -278,17 +464,15 @@ class TestWriteDataset:
 class TestWriteIngestionJob:
 
     def test_creates_job_and_returns_uuid(self):
-        db = MagicMock(spec=["add", "flush"])
         test_uuid = uuid.uuid4()
-
-        db.add.side_effect = lambda obj: setattr(obj, "job_id", test_uuid)
+        db = _FakeDB(assign_on_add={"job_id": test_uuid})
 
         result = write_ingestion_job(
             db, dataset_id=1, original_filename="test.nc"
         )
         assert result == str(test_uuid)
-        db.add.assert_called_once()
-        db.flush.assert_called_once()
+        assert len(db.added) == 1
+        assert db.flush_count == 1
 
 
 # =========================================================================
@@ -297,41 +481,36 @@ class TestWriteIngestionJob:
 class TestUpdateJobStatus:
 
     def test_updates_status(self):
-        db = MagicMock(spec=["execute", "flush"])
-        mock_job = MagicMock()
-        mock_job.started_at = None
-        mock_job.completed_at = None
-        db.execute.return_value = MagicMock(scalar_one_or_none=MagicMock(return_value=mock_job))
+        job = SimpleNamespace(started_at=None, completed_at=None)
+        db = _FakeDB(scalar_one_returns=job)
 
         job_id = str(uuid.uuid4())
         update_job_status(db, job_id=job_id, status="running")
 
-        assert mock_job.status == "running"
-        assert mock_job.started_at is not None  # set on first "running"
-        db.flush.assert_called_once()
+        assert job.status == "running"
+        assert job.started_at is not None  # set on first "running"
+        assert db.flush_count == 1
 
     def test_missing_job_does_not_error(self):
-        db = MagicMock(spec=["execute", "flush"])
-        db.execute.return_value = MagicMock(scalar_one_or_none=MagicMock(return_value=None))
+        db = _FakeDB(scalar_one_returns=None)
 
         job_id = str(uuid.uuid4())
         # Should log error but not raise
         update_job_status(db, job_id=job_id, status="running")
-        db.flush.assert_not_called()
+        assert db.flush_count == 0
 
     def test_succeeded_sets_completed_at(self):
-        db = MagicMock(spec=["execute", "flush"])
-        mock_job = MagicMock()
-        mock_job.started_at = datetime.now(timezone.utc)
-        mock_job.completed_at = None
-        db.execute.return_value = MagicMock(scalar_one_or_none=MagicMock(return_value=mock_job))
+        job = SimpleNamespace(
+            started_at=datetime.now(timezone.utc), completed_at=None
+        )
+        db = _FakeDB(scalar_one_returns=job)
 
         job_id = str(uuid.uuid4())
         update_job_status(db, job_id=job_id, status="succeeded", progress_pct=100)
 
-        assert mock_job.status == "succeeded"
-        assert mock_job.completed_at is not None
-        assert mock_job.progress_pct == 100
+        assert job.status == "succeeded"
+        assert job.completed_at is not None
+        assert job.progress_pct == 100
 
 
 # =========================================================================
@@ -344,7 +523,7 @@ class TestWriteParseResult:
     @patch("app.ingestion.writer.upsert_profile", return_value=101)
     @patch("app.ingestion.writer.upsert_float", return_value=42)
     def test_full_orchestration(self, mock_float, mock_profile, mock_meas, mock_pos):
-        db = MagicMock()
+        db = _FakeDB()
         parse_result = _make_parse_result(success=True, n_measurements=3)
         cleaning_result = _make_cleaning_result(n_measurements=3)
 
@@ -362,7 +541,7 @@ class TestWriteParseResult:
         mock_pos.assert_called_once()
 
     def test_failed_parse_returns_error(self):
-        db = MagicMock()
+        db = _FakeDB()
         parse_result = _make_parse_result(success=False)
         cleaning_result = _make_cleaning_result()
 
@@ -370,7 +549,7 @@ class TestWriteParseResult:
         assert result["success"] is False
 
     def test_failed_cleaning_returns_error(self):
-        db = MagicMock()
+        db = _FakeDB()
         parse_result = _make_parse_result(success=True)
         cleaning_result = CleaningResult(
             success=False, error_message="cleaning failed"